@@ -12,6 +12,10 @@ from pydantic import BaseModel, Field
 import json
 import asyncio
 import logging
+try:
+    import orjson  # Faster JSON encoding for per-token SSE events
+except ImportError:
+    orjson = None
 
 from main import PydanticAIAgent
 
@@ -19,6 +23,15 @@ from main import PydanticAIAgent
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+if orjson is not None:
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+else:
+    _json_dumps = json.dumps
+
+# Completion event never changes - encode it once
+DONE_EVENT = f"data: {_json_dumps({'done': True})}\n\n"
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Pydantic AI Chat API",
@@ -53,6 +66,7 @@ class LocationContext(BaseModel):
     longitude: float | None = Field(None, description="Longitude coordinate")
 
     class Config:
+        frozen = True  # Request data is read-only once validated
         json_schema_extra = {
             "example": {
                 "city": "Indianapolis",
@@ -79,6 +93,7 @@ class ChatRequest(BaseModel):
     )
 
     class Config:
+        frozen = True  # Request data is read-only once validated
         json_schema_extra = {
             "example": {
                 "message": "What is the capital of France?",
@@ -124,6 +139,9 @@ async def startup_event():
             await agent.initialize_memory_async()
             logger.info("Hybrid memory initialized!")
 
+        # Open connections and prime caches before the first request
+        await agent.warmup()
+
         logger.info("Agent fully initialized!")
     except Exception as e:
         logger.error(f"Failed to initialize agent: {e}")
@@ -137,6 +155,10 @@ async def shutdown_event():
     global agent
     logger.info("Shutting down API...")
 
+    # Flush pending memory saves before closing connections
+    if agent:
+        await agent.shutdown()
+
     # Close hybrid memory connections
     if agent and agent.memory:
         try:
@@ -232,19 +254,19 @@ async def chat_stream(request: ChatRequest):
                 location_context=location_dict
             ):
                 # Format as SSE event
-                event_data = json.dumps({'token': token})
+                event_data = _json_dumps({'token': token})
                 yield f"data: {event_data}\n\n"
 
             # Send completion event
             logger.info("Stream completed successfully")
-            yield f"data: {json.dumps({'done': True})}\n\n"
+            yield DONE_EVENT
 
         except Exception as e:
             # Log error
             logger.error(f"Error during streaming: {str(e)}", exc_info=True)
 
             # Send error event to client
-            error_data = json.dumps({'error': str(e)})
+            error_data = _json_dumps({'error': str(e)})
             yield f"data: {error_data}\n\n"
 
     # Return streaming response
@@ -29,6 +29,9 @@ class Config:
     # Mem0 Configuration
     MEM0_USER_ID: str = os.getenv('MEM0_USER_ID', 'default_user')
     MEM0_AGENT_ID: str = os.getenv('MEM0_AGENT_ID', 'pydantic_agent')
+    # Background memory writers. Keep at 1 to store turns strictly in order
+    # (corrections rely on seeing the previous turn first)
+    MEM0_WRITE_WORKERS: int = int(os.getenv('MEM0_WRITE_WORKERS', '1'))
 
     # Neo4j Configuration (for GraphRAG)
     NEO4J_URI: str = os.getenv('NEO4J_URI', 'bolt://localhost:7687')
@@ -45,6 +48,12 @@ class Config:
     LANGFUSE_SECRET_KEY: Optional[str] = os.getenv('LANGFUSE_SECRET_KEY')
     LANGFUSE_ENABLED: bool = os.getenv('LANGFUSE_ENABLED', 'true').lower() == 'true'
 
+    # Semantic Response Cache (Redis Stack)
+    SEMANTIC_CACHE_ENABLED: bool = os.getenv('SEMANTIC_CACHE_ENABLED', 'false').lower() == 'true'
+    REDIS_URL: str = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    SEMANTIC_CACHE_THRESHOLD: float = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.95'))
+    SEMANTIC_CACHE_TTL: int = int(os.getenv('SEMANTIC_CACHE_TTL', '600'))
+
     # Guardrails AI Configuration
     GUARDRAILS_ENABLED: bool = os.getenv('GUARDRAILS_ENABLED', 'true').lower() == 'true'
 
@@ -90,6 +99,7 @@ class Config:
         print(f"PostgreSQL: {cls.POSTGRES_HOST}:{cls.POSTGRES_PORT}")
         print(f"Neo4j: {cls.NEO4J_URI}")
         print(f"Langfuse Enabled: {cls.LANGFUSE_ENABLED}")
+        print(f"Semantic Cache Enabled: {cls.SEMANTIC_CACHE_ENABLED}")
         print(f"Guardrails Enabled: {cls.GUARDRAILS_ENABLED}")
         print(f"Prompt Template: {cls.AGENT_PROMPT_TEMPLATE}")
         print(f"Agent Name: {cls.AGENT_NAME}")
@@ -140,8 +140,9 @@ class ContradictionHandler:
         Returns:
             Number of facts invalidated
         """
+        now = datetime.now()
         if reference_time is None:
-            reference_time = datetime.now()
+            reference_time = now
 
         # Extract keywords from the negation
         keywords = self.extract_topic_keywords(negated_topic)
@@ -169,8 +170,9 @@ class ContradictionHandler:
 
             # Skip facts that were just created (within last 10 seconds)
             # This prevents invalidating the new correct fact that was just added
+            # created_at is wall-clock, so compare against now rather than reference_time
             if edge.created_at is not None:
-                time_diff = (reference_time - edge.created_at.replace(tzinfo=None)).total_seconds()
+                time_diff = (now - edge.created_at.replace(tzinfo=None)).total_seconds()
                 if time_diff < 10:
                     logger.info(f"Skipping recently created fact (created {time_diff:.1f}s ago): {edge.fact}")
                     continue
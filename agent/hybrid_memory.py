@@ -13,6 +13,9 @@ This provides best-of-both-worlds memory:
 import asyncio
 import logging
 import sys
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 from datetime import datetime
 
@@ -29,6 +32,10 @@ from contradiction_handler import ContradictionHandler
 
 logger = logging.getLogger(__name__)
 
+# Recent search results are reused for repeated queries until they expire or memory is written
+SEARCH_CACHE_SIZE = 64
+SEARCH_CACHE_TTL = 60.0  # seconds
+
 
 class HybridMemoryManager:
     """
@@ -72,6 +79,14 @@ class HybridMemoryManager:
         # Store last user message for context enhancement
         self._last_user_message: Optional[str] = None
 
+        # In-flight searches keyed by (query, user_id, limit), shared by concurrent callers
+        self._inflight_searches: Dict[tuple, asyncio.Task] = {}
+
+        # Completed searches: key -> (monotonic time stored, results), least recently used first.
+        # The generation is bumped on every write so searches started before it aren't cached.
+        self._search_cache: "OrderedDict[tuple, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._search_generation = 0
+
     async def initialize(self) -> None:
         """Initialize both mem0 and Graphiti asynchronously."""
         if self._initialized:
@@ -96,6 +111,7 @@ class HybridMemoryManager:
             logger.info(f"Has custom_update_memory_prompt: {'custom_update_memory_prompt' in mem0_config_no_graph}")
 
             self.mem0 = Memory.from_config(mem0_config_no_graph)
+            self._cache_embeddings()
             logger.info("mem0 initialized successfully with OpenAI LLM (vector store only)")
 
             # Initialize Graphiti (knowledge graph)
@@ -147,13 +163,66 @@ class HybridMemoryManager:
             logger.error(f"Failed to initialize hybrid memory: {e}", exc_info=True)
             raise
 
+    async def warmup(self) -> None:
+        """
+        Open the pgvector and Neo4j connections with trivial queries and load the
+        embedding model on the Ollama server.
+
+        The first real search otherwise pays for connection setup and query planning on
+        both stores, plus the embedding model's cold load. Both clients are long-lived,
+        so this is only needed once at startup. Failures are logged and ignored.
+        """
+        if not self._initialized:
+            return
+
+        results = await asyncio.gather(
+            asyncio.to_thread(self.mem0.vector_store.list_cols),
+            self.graphiti.driver.execute_query("RETURN 1"),
+            asyncio.to_thread(self.mem0.embedding_model.embed, "warmup"),
+            return_exceptions=True,
+        )
+        for store, result in zip(("pgvector", "Neo4j", "embedder"), results):
+            if isinstance(result, Exception):
+                logger.warning(f"{store} warmup failed: {result}")
+        logger.info("Hybrid memory connections warmed up")
+
+    def _cache_embeddings(self, maxsize: int = 1024) -> None:
+        """
+        Memoize mem0's embedder so repeated texts are embedded only once.
+
+        The same strings are embedded again and again (the fixed timezone lookup query,
+        repeated tool queries, the semantic cache key), and each call is a round trip to
+        the embedding server. Vectors are stored as tuples and returned as fresh lists.
+
+        Args:
+            maxsize: Maximum number of cached embeddings
+        """
+        embedder = getattr(self.mem0, 'embedding_model', None)
+        if embedder is None:
+            return
+
+        embed = embedder.embed
+
+        @lru_cache(maxsize=maxsize)
+        def cached_embed(text, memory_action):
+            return tuple(embed(text, memory_action))
+
+        def embed_with_cache(text, memory_action=None):
+            if not isinstance(text, str):
+                return embed(text, memory_action)
+            return list(cached_embed(text, memory_action))
+
+        embedder.embed = embed_with_cache
+        logger.info(f"mem0 embeddings cached (maxsize={maxsize})")
+
     async def add(
         self,
         messages: List[Dict[str, str]],
         user_id: str,
         agent_id: Optional[str] = None,
         metadata: Optional[Dict[str, Any]] = None,
-        infer: bool = True
+        infer: bool = True,
+        reference_time: Optional[datetime] = None
     ) -> Dict[str, Any]:
         """
         Add conversation to both mem0 (vectors) and Graphiti (graph).
@@ -164,6 +233,9 @@ class HybridMemoryManager:
             agent_id: Agent identifier
             metadata: Optional metadata dict
             infer: Whether to infer facts for mem0
+            reference_time: When the conversation happened, for Graphiti's temporal
+                            edges and relative dates (defaults to now). Contradicted
+                            facts are still invalidated as of now.
 
         Returns:
             Combined results from both systems
@@ -211,7 +283,8 @@ class HybridMemoryManager:
                             search_query = " ".join(keywords)
                             logger.info(f"Searching mem0 for memories to delete with query: '{search_query}'")
 
-                            related_memories = self.mem0.search(
+                            related_memories = await asyncio.to_thread(
+                                self.mem0.search,
                                 query=search_query,
                                 user_id=user_id,
                                 limit=10
@@ -229,7 +302,7 @@ class HybridMemoryManager:
                                     # ALL keywords must match (more specific)
                                     if all(keyword.lower() in memory_lower for keyword in keywords):
                                         try:
-                                            self.mem0.delete(memory_id=memory_id)
+                                            await asyncio.to_thread(self.mem0.delete, memory_id=memory_id)
                                             logger.info(f"Deleted mem0 memory: {memory_text}")
                                             deleted_count += 1
                                         except Exception as e:
@@ -299,7 +372,9 @@ class HybridMemoryManager:
                 # No enhancement needed, use original message
                 enhanced_messages.append(msg)
 
-            mem0_result = self.mem0.add(
+            # mem0 is synchronous (LLM extraction + embedding + DB write) - keep it off the event loop
+            mem0_result = await asyncio.to_thread(
+                self.mem0.add,
                 messages=enhanced_messages,
                 user_id=user_id,
                 agent_id=agent_id,
@@ -327,7 +402,7 @@ class HybridMemoryManager:
             ])
 
             episode_name = f"Conversation_{user_id}_{datetime.now().isoformat()}"
-            reference_time = datetime.now()
+            reference_time = reference_time or datetime.now()
             graphiti_result = await self.graphiti.add_episode(
                 name=episode_name,
                 episode_body=conversation_text,
@@ -349,8 +424,7 @@ class HybridMemoryManager:
                         logger.info(f"Detected negation/correction: '{negation}'")
                         invalidated_count = await self.contradiction_handler.invalidate_contradicting_facts(
                             negated_topic=negation,
-                            user_id=user_id,
-                            reference_time=reference_time
+                            user_id=user_id
                         )
                         results['invalidated_facts'] = invalidated_count
                         logger.info(f"Invalidated {invalidated_count} contradicting facts")
@@ -368,6 +442,15 @@ class HybridMemoryManager:
             logger.error(f"Error adding to hybrid memory: {e}", exc_info=True)
             return results
 
+        finally:
+            # Cached search results may no longer match what's stored
+            self.invalidate_searches()
+
+    def invalidate_searches(self) -> None:
+        """Drop cached search results and keep in-flight searches from being cached."""
+        self._search_generation += 1
+        self._search_cache.clear()
+
     async def search(
         self,
         query: str,
@@ -377,6 +460,12 @@ class HybridMemoryManager:
         """
         Search both mem0 (vector) and Graphiti (graph).
 
+        Concurrent calls with the same arguments (e.g. the timezone lookup from parallel
+        requests) share a single search, so the query is embedded and run only once.
+        Results are also reused for SEARCH_CACHE_TTL seconds (queries are compared
+        case- and whitespace-insensitively) until the next add(). The returned dict is
+        shared between callers and must not be mutated.
+
         Args:
             query: Search query
             user_id: User identifier
@@ -388,6 +477,26 @@ class HybridMemoryManager:
         if not self._initialized:
             raise RuntimeError("Hybrid memory not initialized. Call initialize() first.")
 
+        key = (" ".join(query.lower().split()), user_id, limit)
+        cached = self._search_cache.get(key)
+        if cached is not None:
+            if time.monotonic() - cached[0] < SEARCH_CACHE_TTL:
+                self._search_cache.move_to_end(key)
+                logger.info(f"Search cache hit for: '{query}'")
+                return cached[1]
+            del self._search_cache[key]
+
+        task = self._inflight_searches.get(key)
+        if task is None:
+            task = asyncio.create_task(self._search(query, user_id, limit, key))
+            self._inflight_searches[key] = task
+            task.add_done_callback(lambda _: self._inflight_searches.pop(key, None))
+        # shield: one caller being cancelled must not cancel the search for the others
+        return await asyncio.shield(task)
+
+    async def _search(self, query: str, user_id: str, limit: int, key: tuple) -> Dict[str, Any]:
+        """Run one hybrid search and cache its results under key (see search())."""
+        generation = self._search_generation
         results = {
             'vector_results': [],
             'graph_results': [],
@@ -395,25 +504,34 @@ class HybridMemoryManager:
         }
 
         try:
-            # Search mem0 (vector store)
-            logger.info(f"Searching mem0 for: '{query}'")
-            mem0_results = self.mem0.search(
-                query=query,
-                user_id=user_id,
-                limit=limit
+            # Search mem0 (vector store) and Graphiti (knowledge graph) concurrently.
+            # mem0 is synchronous (embedding + pgvector query), so it runs in a worker thread.
+            logger.info(f"Searching mem0 and Graphiti for: '{query}'")
+            mem0_results, graphiti_results = await asyncio.gather(
+                asyncio.to_thread(
+                    self.mem0.search,
+                    query=query,
+                    user_id=user_id,
+                    limit=limit
+                ),
+                self.graphiti.search(
+                    query=query,
+                    num_results=limit
+                ),
+                return_exceptions=True,
             )
 
-            if mem0_results and isinstance(mem0_results, dict):
+            # Either store failing must not cost the other store's results
+            if isinstance(mem0_results, BaseException):
+                logger.error(f"mem0 search failed: {mem0_results}")
+            elif mem0_results and isinstance(mem0_results, dict):
                 results['vector_results'] = mem0_results.get('results', [])
 
-            # Search Graphiti (knowledge graph)
-            logger.info(f"Searching Graphiti for: '{query}'")
-            graphiti_results = await self.graphiti.search(
-                query=query,
-                num_results=limit
-            )
-            # Graphiti returns a list of edges directly
-            results['graph_results'] = graphiti_results if graphiti_results else []
+            if isinstance(graphiti_results, BaseException):
+                logger.error(f"Graphiti search failed: {graphiti_results}")
+            else:
+                # Graphiti returns a list of edges directly
+                results['graph_results'] = graphiti_results if graphiti_results else []
 
             # Combine into unified context
             context_parts = []
@@ -423,7 +541,11 @@ class HybridMemoryManager:
             for i, mem in enumerate(results['vector_results']):
                 if isinstance(mem, dict):
                     logger.info(f"Vector result {i} keys: {mem.keys()}")
-                    mem_text = mem.get('memory', mem.get('text', str(mem)))
+                    mem_text = mem.get('memory')
+                    if mem_text is None:
+                        mem_text = mem.get('text')
+                        if mem_text is None:
+                            mem_text = str(mem)
                     context_parts.append(f"- {mem_text}")
                     logger.info(f"Added vector context: {mem_text}")
 
@@ -465,6 +587,12 @@ class HybridMemoryManager:
 
             logger.info(f"Hybrid search returned {len(results['vector_results'])} vector results + {len(results['graph_results'])} graph results")
 
+            # Partial results (a store failed) are not cached, so the next search retries it
+            partial = isinstance(mem0_results, BaseException) or isinstance(graphiti_results, BaseException)
+            if generation == self._search_generation and not partial:
+                self._search_cache[key] = (time.monotonic(), results)
+                if len(self._search_cache) > SEARCH_CACHE_SIZE:
+                    self._search_cache.popitem(last=False)
             return results
 
         except Exception as e:
@@ -4,33 +4,68 @@ Pydantic AI Agent with Mem0, Langfuse, and Guardrails AI
 Main application entry point.
 """
 import asyncio
-from typing import Optional
+import hashlib
+import json
+import operator
+import os
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Optional
 import httpx
 import re
-from datetime import datetime
-import pytz
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from types import MappingProxyType
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 try:
     import ntplib
 except ImportError:
     ntplib = None  # NTP sync will be disabled if ntplib not available
+try:
+    import re2 as regex_engine  # Linear-time DFA matching when google-re2 is installed
+except ImportError:
+    regex_engine = re
 
-from pydantic_ai import Agent
+from pydantic_ai import Agent, RunContext
+from pydantic_ai.settings import ModelSettings
 try:
     from pydantic_ai.models.openai import OpenAIChatModel as OpenAIModel
 except ImportError:
     from pydantic_ai.models.openai import OpenAIModel
+try:
+    from pydantic_ai.providers.openai import OpenAIProvider
+except ImportError:
+    OpenAIProvider = None  # Older pydantic-ai: fall back to the model string and its default client
+try:
+    from httpx_aiohttp import AiohttpTransport  # aiohttp-backed transport holds up better under high concurrency
+except ImportError:
+    AiohttpTransport = None
+try:
+    import uvloop  # libuv-based event loop, faster socket I/O for the CLI
+except ImportError:
+    uvloop = None
 
 # Mem0 for long-term memory
-from mem0 import Memory
 from hybrid_memory import HybridMemoryManager
+from semantic_cache import SemanticCache
 
-# Langfuse for observability
-from langfuse import Langfuse
-try:
-    from langfuse.decorators import observe
-except ImportError:
-    # Langfuse 3.x compatibility
-    from langfuse import observe
+from config import config
+
+# Langfuse for observability - only imported when enabled (it pulls in a large dependency chain)
+if config.LANGFUSE_ENABLED:
+    try:
+        from langfuse.decorators import observe
+    except ImportError:
+        # Langfuse 3.x compatibility
+        from langfuse import observe
+else:
+    def observe(*args, **kwargs):
+        """No-op stand-in for langfuse's @observe() when observability is disabled."""
+        return lambda fn: fn
+
+if TYPE_CHECKING:
+    from langfuse import Langfuse
 
 # Guardrails AI - disabled for now
 # from guardrails import Guard
@@ -40,7 +75,6 @@ except ImportError:
 #     ToxicLanguage = None  # Guardrails validator not available
 
 # Local imports
-from config import config
 from prompts import get_system_prompt
 from utils import (
     setup_logging,
@@ -52,911 +86,391 @@ from utils import (
     sanitize_input,
     is_exit_command,
     create_conversation_metadata,
+    ConversationMetadata,
 )
 
 # Setup logging
 logger = setup_logging(config.LOG_LEVEL)
 
-# Custom fact extraction prompt for Mem0
-# Note: This works best with larger models (8B+). With smaller models like llama3.2 (3B),
-# some facts from assistant messages may be incorrectly extracted.
-CUSTOM_FACT_EXTRACTION_PROMPT = """CRITICAL: You MUST return ONLY this exact JSON structure. NO other formats allowed:
-{"facts": ["fact1", "fact2", ...]}
+# Matches explicit IANA timezone strings in memories (e.g. "America/New_York")
+TIMEZONE_PATTERN = regex_engine.compile(r'\b([A-Z][a-z]+/[A-Z][a-z_]+)\b')
+
+# Custom Mem0 prompts live in mem0_prompts/ and are read on first use:
+# - fact_extraction.txt: custom fact extraction prompt
+#   Note: This works best with larger models (8B+). With smaller models like llama3.2 (3B),
+#   some facts from assistant messages may be incorrectly extracted.
+# - update_memory.txt: custom memory update prompt
+# - entity_extraction.txt: graph entity/relationship extraction prompt
+MEM0_PROMPTS_DIR = Path(__file__).resolve().parent / "mem0_prompts"
+
+# Module attributes kept for `from main import CUSTOM_..._PROMPT` in the test scripts
+_PROMPT_FILES = {
+    "CUSTOM_FACT_EXTRACTION_PROMPT": "fact_extraction.txt",
+    "CUSTOM_UPDATE_MEMORY_PROMPT": "update_memory.txt",
+    "CUSTOM_ENTITY_EXTRACTION_PROMPT": "entity_extraction.txt",
+}
 
-Extract facts from the user message. Each fact should be a separate string in the "facts" array.
 
-RULES:
-1. ALWAYS include the "facts" key - even if empty: {"facts": []}
-2. Extract location details with FULL specificity (city, neighborhood, area, side of town)
-3. Break down compound statements into separate facts
-4. Extract personal info, preferences, actions, tools, dates, times
-5. User questions return empty array: {"facts": []}
-6. Extract from USER messages only, ignore assistant responses
+@lru_cache(maxsize=None)
+def _load_mem0_prompt(filename: str) -> str:
+    """
+    Read a Mem0 prompt file once and keep it for the life of the process.
 
-MANDATORY OUTPUT FORMAT:
-{"facts": ["string1", "string2", ...]}
+    Args:
+        filename: File name inside mem0_prompts/
 
-Examples:
+    Returns:
+        Prompt text
+    """
+    return (MEM0_PROMPTS_DIR / filename).read_text(encoding="utf-8")
+
+
+def get_fact_extraction_prompt() -> str:
+    """Custom Mem0 fact extraction prompt."""
+    return _load_mem0_prompt("fact_extraction.txt")
+
+
+def get_update_memory_prompt() -> str:
+    """Custom Mem0 memory update prompt."""
+    return _load_mem0_prompt("update_memory.txt")
+
+
+def __getattr__(name: str):
+    if name in _PROMPT_FILES:
+        return _load_mem0_prompt(_PROMPT_FILES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+AGENT_MODEL = "openai:gpt-4o-mini"
+MEMORY_TOOL_TOP_K = 20  # default and upper bound for the search_memory tool's k
+MEMORY_TOKEN_BUDGET = 1500  # approximate, measured as len(text) // 4
+
+# Background memory writer: bounded queue, config.MEM0_WRITE_WORKERS consumers, retries with exponential backoff
+SAVE_QUEUE_MAXSIZE = 1024
+SAVE_MAX_ATTEMPTS = 3
+SAVE_RETRY_BASE_DELAY = 0.5
+
+# Stream batching: flush accumulated token deltas once either threshold is reached
+STREAM_FLUSH_CHARS = 50
+STREAM_FLUSH_INTERVAL = 0.05  # seconds
+
+# NTP clock offset is re-measured at most this often; failed syncs are retried sooner
+NTP_OFFSET_TTL = 600  # seconds
+NTP_RETRY_INTERVAL = 60  # seconds
+
+# Timezone resolved from memory is reused per user until it expires or the user mentions a location
+TIMEZONE_CACHE_TTL = 3600  # seconds
+
+# Mapping of common US cities to their IANA timezones (read-only)
+CITY_TO_TIMEZONE = MappingProxyType({
+    'new york': 'America/New_York',
+    'nyc': 'America/New_York',
+    'boston': 'America/New_York',
+    'philadelphia': 'America/New_York',
+    'washington': 'America/New_York',
+    'miami': 'America/New_York',
+    'atlanta': 'America/New_York',
+    'chicago': 'America/Chicago',
+    'indianapolis': 'America/Indiana/Indianapolis',
+    'dallas': 'America/Chicago',
+    'houston': 'America/Chicago',
+    'denver': 'America/Denver',
+    'phoenix': 'America/Phoenix',
+    'los angeles': 'America/Los_Angeles',
+    'la': 'America/Los_Angeles',
+    'san francisco': 'America/Los_Angeles',
+    'sf': 'America/Los_Angeles',
+    'seattle': 'America/Los_Angeles',
+    'portland': 'America/Los_Angeles',
+    'las vegas': 'America/Los_Angeles',
+})
+
+# (city, timezone) pairs, longest city first so 'atlanta' is tried before its substring 'la'
+CITY_TOKENS = tuple(sorted(CITY_TO_TIMEZONE.items(), key=lambda item: len(item[0]), reverse=True))
+
+# All city names as one whole-word alternation, so each memory is scanned in a single pass
+CITY_PATTERN = regex_engine.compile(r'\b(' + '|'.join(re.escape(city) for city, _ in CITY_TOKENS) + r')\b')
+
+# Words that make a reply depend on the clock; such turns bypass the semantic response cache
+TIME_SENSITIVE_PATTERN = regex_engine.compile(
+    r'\b(time|date|clock|now|today|tonight|tomorrow|yesterday|day|week|weekend|month|year'
+    r'|morning|afternoon|evening|hour|minute|monday|tuesday|wednesday|thursday|friday'
+    r'|saturday|sunday)s?\b'
+)
 
-user: My name is John
-assistant: Hi John!
-{"facts": ["Name is John"]}
 
-user: I work at Tesla as a senior engineer
-assistant: Tesla is great!
-{"facts": ["Works at Tesla", "Position: senior engineer"]}
+@lru_cache(maxsize=64)
+def _get_tz(name: str) -> ZoneInfo:
+    """
+    Get a timezone by IANA name (cached; invalid names are not cached).
 
-user: I live on the north side of Indianapolis
-assistant: That's a nice area!
-{"facts": ["Lives in Indianapolis", "Lives on north side of Indianapolis"]}
+    Args:
+        name: IANA timezone name (e.g. 'America/New_York')
 
-user: I live in San Francisco, specifically in the Mission District
-assistant: The Mission is vibrant!
-{"facts": ["Lives in San Francisco", "Lives in Mission District"]}
+    Returns:
+        ZoneInfo for the timezone
 
-user: Where am I going?
-assistant: You're going to Spain.
-{"facts": []}
+    Raises:
+        ZoneInfoNotFoundError: If the timezone is unknown
+        ValueError: If the name is not a valid timezone key
+    """
+    return ZoneInfo(name)
 
-user: I'm travelling to Paris next week
-assistant: Paris is beautiful!
-{"facts": ["Travelling to Paris", "Leaving next week"]}
 
-user: I prefer working in the mornings
-assistant: Morning work is productive!
-{"facts": ["Prefers working in mornings"]}
+# Pre-load the timezones we can resolve to, so no message pays for reading tzdata
+for _tz_name in {'UTC', *CITY_TO_TIMEZONE.values()}:
+    try:
+        _get_tz(_tz_name)
+    except (ZoneInfoNotFoundError, ValueError):
+        pass  # Missing tzdata - the lookup is retried (and handled) when first used
 
-user: I used the GitHub API to search for Python repositories
-assistant: I found 150 results.
-{"facts": ["Used GitHub API", "Searched for Python repositories", "Action: API search"]}
 
-user: I deployed my app to Azure using Docker containers
-assistant: Deployment successful!
-{"facts": ["Deployed app to Azure", "Used Docker containers", "Deployment method: Docker", "Platform: Azure"]}
+def _mentions_location(text: str) -> bool:
+    """
+    Check whether a message could change the timezone we'd infer from memory.
 
-user: I ran a PowerShell script to clean up stale AD accounts
-assistant: The script completed successfully.
-{"facts": ["Ran PowerShell script", "Script purpose: clean up stale AD accounts", "Tool: PowerShell", "Target: Active Directory"]}
+    Args:
+        text: User message
 
-user: I automated the backup process with a cron job running every night at 2am
-assistant: Automation set up successfully.
-{"facts": ["Automated backup process", "Method: cron job", "Schedule: every night at 2am", "Action type: automation"]}
+    Returns:
+        True if the message mentions a timezone or a known city
+    """
+    text_lower = text.lower()
+    if 'timezone' in text_lower or 'time zone' in text_lower or TIMEZONE_PATTERN.search(text):
+        return True
+    return CITY_PATTERN.search(text_lower) is not None
 
-user: I usually work from my office downtown near 5th and Main
-assistant: That's convenient!
-{"facts": ["Works from office", "Office is downtown", "Office near 5th and Main"]}
 
-user: I'm John Doe, and I'd like to return the shoes I bought last week.
-assistant: No problem, I'll help you with that.
-{"facts": ["Customer name: John Doe", "Wants to return shoes", "Purchase made last week"]}
+def _find_city(text_lower: str) -> Optional[str]:
+    """
+    Find the first known city named in a text.
 
-user: I created an Azure Logic App to sync data between SharePoint and SQL
-assistant: Logic App deployed.
-{"facts": ["Created Azure Logic App", "Integration: SharePoint to SQL", "Tool: Azure Logic Apps", "Data source: SharePoint", "Data destination: SQL"]}
+    Args:
+        text_lower: Lowercased text to scan
 
-user: I'm troubleshooting Azure AD Connect sync issues between on-prem AD and Entra ID
-assistant: Let me help with that.
-{"facts": ["Troubleshooting Azure AD Connect", "Issue: sync problems", "Source: on-premises AD", "Destination: Entra ID", "Tool: Azure AD Connect"]}
+    Returns:
+        City name (a CITY_TO_TIMEZONE key), or None if no known city is mentioned
+    """
+    match = CITY_PATTERN.search(text_lower)
+    return match.group(1) if match else None
 
-Return: {"facts": [...]}
-"""
 
-CUSTOM_ENTITY_EXTRACTION_PROMPT = """You are an expert at extracting entities and their relationships from conversations about IT infrastructure, MSP operations, technical workflows, and personal contexts.
-
-CRITICAL EXTRACTION RULES:
-1. **Extract ONLY from USER messages** - DO NOT extract entities or relationships from assistant/agent responses
-2. **Use conversation context** - If a user mentions "town" or "city" without naming it, look at previous context (company location, etc.) to infer which city
-3. **Create hierarchical location relationships** - When extracting neighborhoods/areas (like "north side of town"), ALWAYS link them to the parent city using PART_OF relationship
-4. **Ignore agent responses** - Messages like "I don't have that information" should be completely ignored for extraction
-
-Extract ONLY concrete entities and their relationships. Break down compound information into separate entities and relationships.
-
-ENTITY TYPES:
-
-**Professional/Technical:**
-- Person: Names of individuals
-- Organization/Client: Company names, client names
-- Tool/Platform: Software, APIs, services, applications (Azure, Intune, N-Central, CrowdStrike, etc.)
-- Project: Specific projects or initiatives
-- Device: Computers, servers, endpoints with names/identifiers
-- Environment: Kiosk, VDI, production, test environments
-- Team/Department: Groups within organizations
-- Technology: Programming languages, protocols, frameworks
-- Skill/Expertise: Technical abilities or knowledge areas
-- Action/Task: Specific operations, automations, scripts
-- Issue/Incident: Problems, errors, tickets
-- Policy/Configuration: Rules, settings, configurations
-- Resource: Azure resources, storage, networks, infrastructure components
-
-**Location & Geography:**
-- Location: Places with full specificity (city, neighborhood, area, office location)
-- Address: Specific street addresses
-- Venue: Restaurants, stores, facilities
-
-**Temporal:**
-- Temporal: Dates, schedules, time windows, deadlines, frequencies
-- Event: Meetings, appointments, celebrations, milestones
-
-**Personal & Lifestyle:**
-- Hobby/Interest: Activities, pastimes, interests
-- Media: Books, movies, TV shows, podcasts, music, games
-- Food: Dishes, restaurants, cuisines, dietary restrictions
-- Health: Medical conditions, medications, doctors, fitness activities
-- Relationship: Family members, friends, contacts (with context)
-
-**Financial & Commerce:**
-- Account: Bank accounts, investment accounts, subscriptions
-- Product: Physical products, purchases
-- Service: Subscription services, memberships
-- Transaction: Orders, purchases, payments
-
-**Education & Learning:**
-- Course: Classes, training programs
-- Certification: Professional certifications, qualifications
-- Institution: Schools, universities, training centers
-
-**Documents & Content:**
-- Document: Files, reports, contracts, notes
-- Website: URLs, online resources
-- Communication: Email threads, messages, channels
-
-**Goals & Objectives:**
-- Goal: Personal or professional objectives
-- Habit: Regular routines, practices
-- Preference: Likes, dislikes, choices
-
-RELATIONSHIP TYPES:
-
-**Professional:**
-- WORKS_AT, WORKS_AS, MANAGES, LEADS, REPORTS_TO
-- USES_TOOL, PREFERS_TOOL, DEPLOYED, CONFIGURED
-- MANAGES_CLIENT, HAS_ENVIRONMENT
-- CREATED, BUILT, DEVELOPED, WROTE
-- INTEGRATES_WITH, CONNECTS_TO, SYNCS_WITH
-- TARGETS, APPLIED_TO, OPERATES_ON
-- RESOLVED_WITH, FIXED_BY, CAUSED_BY
-- MEMBER_OF, PART_OF, BELONGS_TO
-
-**Location & Movement:**
-- LIVES_IN, WORKS_FROM, LOCATED_IN, LOCATED_AT
-- TRAVELS_TO, VISITED, MOVING_TO
-
-**Temporal:**
-- SCHEDULED_FOR, EXPIRES_ON, DUE_ON, RUNS_AT
-- STARTED_ON, COMPLETED_ON, OCCURRED_ON
-- HAPPENS_EVERY, REPEATS_ON
-
-**Personal:**
-- INTERESTED_IN, ENJOYS, DISLIKES
-- PRACTICES, PLAYS, LEARNS
-- RELATED_TO (family), FRIENDS_WITH, KNOWS
-- READS, WATCHES, LISTENS_TO
-- EATS_AT, PREFERS_FOOD
-
-**Health & Wellness:**
-- DIAGNOSED_WITH, TAKES_MEDICATION, TREATS
-- EXERCISES_WITH, TRAINS_FOR
-- PRESCRIBED_BY, SEEING_DOCTOR
-
-**Financial:**
-- OWNS, PURCHASED, SUBSCRIBED_TO
-- COSTS, PAID_FOR, INVESTED_IN
-- RENEWED_ON, CANCELLED
-
-**Education:**
-- ENROLLED_IN, COMPLETED, STUDYING
-- CERTIFIED_IN, QUALIFIED_FOR
-- TEACHES, MENTORS, LEARNS_FROM
-
-**Goals & Habits:**
-- WORKING_TOWARDS, ACHIEVED, PURSUING
-- DOES_DAILY, DOES_WEEKLY, ROUTINELY_PERFORMS
-- WANTS_TO, PLANS_TO, CONSIDERING
-
-Format your response as JSON with entities and relationships:
-
-Examples:
-
-Input: "My name is John and I work at Tesla"
-Output:
-{
-    "entities": [
-        {"name": "John", "type": "Person"},
-        {"name": "Tesla", "type": "Organization"}
-    ],
-    "relationships": [
-        {"from": "John", "to": "Tesla", "type": "WORKS_AT"}
-    ]
-}
+def _memory_text(mem) -> str:
+    """
+    Extract the text of a memory record without eagerly building a str() fallback.
 
-Input: "I'm working on the Cybertruck project"
-Output:
-{
-    "entities": [
-        {"name": "Cybertruck", "type": "Project"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "Cybertruck", "type": "WORKS_ON"}
-    ]
-}
+    Args:
+        mem: Memory record (dict from mem0 or any other object)
 
-Input: "My colleague Sarah leads the battery team"
-Output:
-{
-    "entities": [
-        {"name": "Sarah", "type": "Person"},
-        {"name": "battery team", "type": "Team"}
-    ],
-    "relationships": [
-        {"from": "Sarah", "to": "battery team", "type": "LEADS"}
-    ]
-}
+    Returns:
+        Memory text
+    """
+    if isinstance(mem, dict):
+        mem_text = mem.get('memory')
+        if mem_text is None:
+            mem_text = mem.get('text')
+        if mem_text is not None:
+            return mem_text
+    return str(mem)
 
-Input: "I live on the north side of Indianapolis"
-Output:
-{
-    "entities": [
-        {"name": "Indianapolis", "type": "Location"},
-        {"name": "north side of Indianapolis", "type": "Location"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "north side of Indianapolis", "type": "LIVES_IN"},
-        {"from": "north side of Indianapolis", "to": "Indianapolis", "type": "PART_OF"}
-    ]
-}
 
-Input: "I live and work on the north side of town" (Context: User's company is in Indianapolis)
-Output:
-{
-    "entities": [
-        {"name": "Indianapolis", "type": "Location"},
-        {"name": "north side of Indianapolis", "type": "Location"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "north side of Indianapolis", "type": "LIVES_IN"},
-        {"from": "Person", "to": "north side of Indianapolis", "type": "WORKS_FROM"},
-        {"from": "north side of Indianapolis", "to": "Indianapolis", "type": "PART_OF"}
-    ]
-}
+def _distance(score) -> float:
+    """Sort key for a mem0 score (cosine distance); records without one go last."""
+    return float('inf') if score is None else score
 
-Input: "I used the Microsoft Graph API to query stale Intune devices for Acme Corp"
-Output:
-{
-    "entities": [
-        {"name": "Microsoft Graph API", "type": "Tool"},
-        {"name": "Intune", "type": "Platform"},
-        {"name": "Acme Corp", "type": "Client"},
-        {"name": "stale Intune devices", "type": "Resource"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "Microsoft Graph API", "type": "USES_TOOL"},
-        {"from": "Microsoft Graph API", "to": "stale Intune devices", "type": "QUERIES"},
-        {"from": "stale Intune devices", "to": "Intune", "type": "MANAGED_BY"},
-        {"from": "stale Intune devices", "to": "Acme Corp", "type": "BELONGS_TO"}
-    ]
-}
 
-Input: "I deployed an Azure Function with Python to automate Office 365 license reporting"
-Output:
-{
-    "entities": [
-        {"name": "Azure Function", "type": "Platform"},
-        {"name": "Python", "type": "Technology"},
-        {"name": "Office 365 license reporting", "type": "Action"},
-        {"name": "Office 365", "type": "Platform"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "Azure Function", "type": "DEPLOYED"},
-        {"from": "Azure Function", "to": "Python", "type": "USES"},
-        {"from": "Azure Function", "to": "Office 365 license reporting", "type": "AUTOMATES"},
-        {"from": "Office 365 license reporting", "to": "Office 365", "type": "TARGETS"}
-    ]
-}
+def _iter_memory_entries(memories: dict, k: int) -> Iterator[tuple[str, str]]:
+    """
+    Yield (id, text) memory entries from hybrid search results, nearest first.
 
-Input: "I configured FSLogix App Masking for the kiosk environment at Smith Industries"
-Output:
-{
-    "entities": [
-        {"name": "FSLogix App Masking", "type": "Tool"},
-        {"name": "kiosk environment", "type": "Environment"},
-        {"name": "Smith Industries", "type": "Client"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "FSLogix App Masking", "type": "CONFIGURED"},
-        {"from": "FSLogix App Masking", "to": "kiosk environment", "type": "APPLIED_TO"},
-        {"from": "kiosk environment", "to": "Smith Industries", "type": "BELONGS_TO"}
-    ]
-}
+    Vector results come first, cut to the k nearest. mem0's pgvector score is a cosine
+    distance (lower is closer), so they are ordered by ascending score, and the most
+    recently updated memory wins among equal distances. Active graph facts follow;
+    invalidated graph facts are skipped.
 
-Input: "I ran a PowerShell script to cross-reference AD, Entra ID, and CrowdStrike data"
-Output:
-{
-    "entities": [
-        {"name": "PowerShell script", "type": "Action"},
-        {"name": "PowerShell", "type": "Tool"},
-        {"name": "Active Directory", "type": "Platform"},
-        {"name": "Entra ID", "type": "Platform"},
-        {"name": "CrowdStrike", "type": "Platform"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "PowerShell script", "type": "EXECUTED"},
-        {"from": "PowerShell script", "to": "PowerShell", "type": "USES"},
-        {"from": "PowerShell script", "to": "Active Directory", "type": "QUERIES"},
-        {"from": "PowerShell script", "to": "Entra ID", "type": "QUERIES"},
-        {"from": "PowerShell script", "to": "CrowdStrike", "type": "QUERIES"}
-    ]
-}
+    Args:
+        memories: Result of HybridMemoryManager.search()
+        k: Maximum number of vector memories to yield
 
-Input: "I scheduled the Azure AD Connect sync to run every 30 minutes"
-Output:
-{
-    "entities": [
-        {"name": "Azure AD Connect sync", "type": "Action"},
-        {"name": "Azure AD Connect", "type": "Tool"},
-        {"name": "every 30 minutes", "type": "Temporal"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "Azure AD Connect sync", "type": "SCHEDULED"},
-        {"from": "Azure AD Connect sync", "to": "Azure AD Connect", "type": "USES"},
-        {"from": "Azure AD Connect sync", "to": "every 30 minutes", "type": "RUNS_AT"}
-    ]
-}
+    Yields:
+        Tuples of (memory id, memory text)
+    """
+    vector_results = [mem for mem in memories.get('vector_results', []) if isinstance(mem, dict)]
+    # Two stable sorts: newest first, then by distance, so recency only breaks distance ties
+    vector_results.sort(key=lambda mem: mem.get('updated_at') or mem.get('created_at') or '', reverse=True)
+    vector_results.sort(key=lambda mem: _distance(mem.get('score')))
+    for mem in vector_results[:k]:
+        yield str(mem.get('id', '')), _memory_text(mem)
+
+    for edge in memories.get('graph_results', []):
+        if getattr(edge, 'invalid_at', None) is not None:
+            continue
+        fact = getattr(edge, 'fact', None) or getattr(edge, 'name', None)
+        if fact:
+            yield str(getattr(edge, 'uuid', '')), fact
+
+
+def _pack_memories(memories: dict, k: int, token_budget: int = MEMORY_TOKEN_BUDGET) -> str:
+    """
+    Pack hybrid search results into a deterministic, versioned context block.
 
-Input: "The client's Office 365 E3 licenses expire on December 15, 2025"
-Output:
-{
-    "entities": [
-        {"name": "Client", "type": "Organization"},
-        {"name": "Office 365 E3 licenses", "type": "Resource"},
-        {"name": "December 15, 2025", "type": "Temporal"}
-    ],
-    "relationships": [
-        {"from": "Client", "to": "Office 365 E3 licenses", "type": "HAS"},
-        {"from": "Office 365 E3 licenses", "to": "December 15, 2025", "type": "EXPIRES_ON"}
-    ]
-}
+    Entries are taken nearest-first (the order of _iter_memory_entries) until the
+    token budget is used up, so the budget drops the least relevant memories. The
+    kept entries are then ordered by id so the same set of memories always renders
+    to the same text regardless of search ranking.
 
-Input: "I set up a maintenance window every Tuesday from 2am to 4am for server patching"
-Output:
-{
-    "entities": [
-        {"name": "maintenance window", "type": "Action"},
-        {"name": "every Tuesday 2am-4am", "type": "Temporal"},
-        {"name": "server patching", "type": "Action"},
-        {"name": "servers", "type": "Device"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "maintenance window", "type": "CREATED"},
-        {"from": "maintenance window", "to": "every Tuesday 2am-4am", "type": "SCHEDULED_FOR"},
-        {"from": "maintenance window", "to": "server patching", "type": "FOR_PURPOSE"},
-        {"from": "server patching", "to": "servers", "type": "TARGETS"}
-    ]
-}
+    Args:
+        memories: Result of HybridMemoryManager.search()
+        k: Maximum number of vector memories to keep
+        token_budget: Approximate token limit for the packed entries
 
-Input: "I troubleshot wireless connectivity on Dell Latitude laptops by updating Intel drivers"
-Output:
-{
-    "entities": [
-        {"name": "wireless connectivity issue", "type": "Issue"},
-        {"name": "Dell Latitude laptops", "type": "Device"},
-        {"name": "Intel drivers", "type": "Resource"},
-        {"name": "driver update", "type": "Action"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "wireless connectivity issue", "type": "TROUBLESHOT"},
-        {"from": "wireless connectivity issue", "to": "Dell Latitude laptops", "type": "AFFECTS"},
-        {"from": "wireless connectivity issue", "to": "driver update", "type": "RESOLVED_BY"},
-        {"from": "driver update", "to": "Intel drivers", "type": "UPDATES"}
-    ]
-}
+    Returns:
+        Context block, or "" when nothing relevant was found
+    """
+    entries = []
+    tokens_used = 0
+    for entry in _iter_memory_entries(memories, k):
+        entry_tokens = len(entry[1]) // 4 + 1
+        if entries and tokens_used + entry_tokens > token_budget:
+            break
+        entries.append(entry)
+        tokens_used += entry_tokens
+
+    if not entries:
+        return ""
 
-Input: "I prefer using the Az PowerShell module over Azure CLI for automation scripts"
-Output:
-{
-    "entities": [
-        {"name": "Az PowerShell module", "type": "Tool"},
-        {"name": "Azure CLI", "type": "Tool"},
-        {"name": "automation scripts", "type": "Action"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "Az PowerShell module", "type": "PREFERS_TOOL"},
-        {"from": "Az PowerShell module", "to": "automation scripts", "type": "USED_FOR"},
-        {"from": "Person", "to": "Azure CLI", "type": "ALTERNATIVE_TO"}
-    ]
-}
+    entries.sort()
+    body = "\n".join(f"- {text}" for _, text in entries)
+    version = hashlib.md5(body.encode("utf-8")).hexdigest()[:12]
+    return f"[Previous Context] (v{version}):\n{body}"
 
-Input: "I created an Intune dynamic group for Windows 11 devices in the finance department"
-Output:
-{
-    "entities": [
-        {"name": "Intune dynamic group", "type": "Resource"},
-        {"name": "Intune", "type": "Platform"},
-        {"name": "Windows 11 devices", "type": "Device"},
-        {"name": "finance department", "type": "Department"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "Intune dynamic group", "type": "CREATED"},
-        {"from": "Intune dynamic group", "to": "Intune", "type": "MANAGED_BY"},
-        {"from": "Intune dynamic group", "to": "Windows 11 devices", "type": "CONTAINS"},
-        {"from": "Windows 11 devices", "to": "finance department", "type": "BELONGS_TO"}
-    ]
-}
 
-Input: "I deployed Azure Container Apps for hosting our client portal microservices"
-Output:
-{
-    "entities": [
-        {"name": "Azure Container Apps", "type": "Platform"},
-        {"name": "client portal", "type": "Project"},
-        {"name": "microservices", "type": "Technology"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "Azure Container Apps", "type": "DEPLOYED"},
-        {"from": "Azure Container Apps", "to": "client portal", "type": "HOSTS"},
-        {"from": "client portal", "to": "microservices", "type": "USES"}
-    ]
-}
+async def search_memory(ctx: RunContext[HybridMemoryManager], query: str, k: int = MEMORY_TOOL_TOP_K) -> str:
+    """
+    Search long-term memory for facts about the user.
 
-Input: "I ran Get-ADComputer in PowerShell to audit stale computer accounts older than 90 days"
-Output:
-{
-    "entities": [
-        {"name": "Get-ADComputer", "type": "Tool"},
-        {"name": "PowerShell", "type": "Tool"},
-        {"name": "stale computer accounts", "type": "Resource"},
-        {"name": "Active Directory", "type": "Platform"},
-        {"name": "90 days", "type": "Temporal"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "Get-ADComputer", "type": "EXECUTED"},
-        {"from": "Get-ADComputer", "to": "PowerShell", "type": "RUNS_IN"},
-        {"from": "Get-ADComputer", "to": "stale computer accounts", "type": "QUERIES"},
-        {"from": "stale computer accounts", "to": "Active Directory", "type": "STORED_IN"},
-        {"from": "stale computer accounts", "to": "90 days", "type": "OLDER_THAN"}
-    ]
-}
+    Call this whenever the user asks about themselves, their preferences, or anything
+    they may have told you before. The result is the [Previous Context] for the answer.
 
-Input: "I used CrowdStrike Falcon's RTR to remotely remediate the infected machine"
-Output:
-{
-    "entities": [
-        {"name": "CrowdStrike Falcon", "type": "Platform"},
-        {"name": "RTR", "type": "Tool"},
-        {"name": "infected machine", "type": "Device"},
-        {"name": "remediation", "type": "Action"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "RTR", "type": "USES_TOOL"},
-        {"from": "RTR", "to": "CrowdStrike Falcon", "type": "PART_OF"},
-        {"from": "RTR", "to": "remediation", "type": "PERFORMS"},
-        {"from": "remediation", "to": "infected machine", "type": "TARGETS"}
-    ]
-}
+    Args:
+        query: What to look up, e.g. "user's employer" or "user's favorite food"
+        k: Maximum number of memories to return
+    """
+    memory = ctx.deps
+    if memory is None:
+        return "[Previous Context]: (memory unavailable)"
 
-Input: "I wrote a Logic App to handle Microsoft Graph API throttling for bulk operations"
-Output:
-{
-    "entities": [
-        {"name": "Logic App", "type": "Tool"},
-        {"name": "Azure Logic Apps", "type": "Platform"},
-        {"name": "Microsoft Graph API", "type": "Platform"},
-        {"name": "API throttling", "type": "Issue"},
-        {"name": "bulk operations", "type": "Action"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "Logic App", "type": "CREATED"},
-        {"from": "Logic App", "to": "Azure Logic Apps", "type": "RUNS_ON"},
-        {"from": "Logic App", "to": "API throttling", "type": "HANDLES"},
-        {"from": "API throttling", "to": "Microsoft Graph API", "type": "CAUSED_BY"},
-        {"from": "Logic App", "to": "bulk operations", "type": "ENABLES"}
-    ]
-}
+    # k comes from the model - keep the mem0/Graphiti query bounded whatever it asks for
+    k = max(1, min(k, MEMORY_TOOL_TOP_K))
 
-Input: "I configured hybrid Azure AD join for workstations at three different client locations"
-Output:
-{
-    "entities": [
-        {"name": "hybrid Azure AD join", "type": "Configuration"},
-        {"name": "Azure AD", "type": "Platform"},
-        {"name": "workstations", "type": "Device"},
-        {"name": "three client locations", "type": "Location"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "hybrid Azure AD join", "type": "CONFIGURED"},
-        {"from": "hybrid Azure AD join", "to": "Azure AD", "type": "USES"},
-        {"from": "hybrid Azure AD join", "to": "workstations", "type": "APPLIED_TO"},
-        {"from": "workstations", "to": "three client locations", "type": "LOCATED_IN"}
-    ]
-}
+    try:
+        logger.info("Memory tool searching for: '%s' (k=%d)", query, k)
+        memories = await memory.search(query=query, user_id=config.MEM0_USER_ID, limit=k)
+        packed = _pack_memories(memories, k) if isinstance(memories, dict) else ""
+    except Exception as e:
+        logger.error("Error retrieving memories: %s", e)
+        packed = ""
 
-Input: "Yesterday I migrated 50 mailboxes from on-prem Exchange to Exchange Online"
-Output:
-{
-    "entities": [
-        {"name": "mailbox migration", "type": "Action"},
-        {"name": "50 mailboxes", "type": "Resource"},
-        {"name": "on-premises Exchange", "type": "Platform"},
-        {"name": "Exchange Online", "type": "Platform"},
-        {"name": "yesterday", "type": "Temporal"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "mailbox migration", "type": "PERFORMED"},
-        {"from": "mailbox migration", "to": "yesterday", "type": "OCCURRED_ON"},
-        {"from": "mailbox migration", "to": "50 mailboxes", "type": "MIGRATED"},
-        {"from": "50 mailboxes", "to": "on-premises Exchange", "type": "SOURCE"},
-        {"from": "50 mailboxes", "to": "Exchange Online", "type": "DESTINATION"}
-    ]
-}
+    if not packed:
+        return "[Previous Context]: (no stored information found)"
+    logger.info("Memory tool returning context (length=%d)", len(packed))
+    return packed
 
-**Additional General Purpose Examples:**
-
-Input: "I'm reading 'Atomic Habits' and trying to build a morning workout routine"
-Output:
-{
-    "entities": [
-        {"name": "Atomic Habits", "type": "Media"},
-        {"name": "morning workout routine", "type": "Habit"},
-        {"name": "workout", "type": "Health"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "Atomic Habits", "type": "READS"},
-        {"from": "Person", "to": "morning workout routine", "type": "BUILDING"},
-        {"from": "morning workout routine", "to": "workout", "type": "INCLUDES"}
-    ]
-}
 
-Input: "My daughter Sarah is taking piano lessons at Harmony Music School every Wednesday"
-Output:
-{
-    "entities": [
-        {"name": "Sarah", "type": "Person"},
-        {"name": "piano lessons", "type": "Course"},
-        {"name": "Harmony Music School", "type": "Institution"},
-        {"name": "every Wednesday", "type": "Temporal"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "Sarah", "type": "PARENT_OF"},
-        {"from": "Sarah", "to": "piano lessons", "type": "ENROLLED_IN"},
-        {"from": "piano lessons", "to": "Harmony Music School", "type": "LOCATED_AT"},
-        {"from": "piano lessons", "to": "every Wednesday", "type": "SCHEDULED_FOR"}
-    ]
-}
+def _select_result_unwrapper(result: Any) -> Callable[[Any], str]:
+    """
+    Pick how to read the response text from an Agent.run() result.
 
-Input: "I'm allergic to shellfish and prefer vegan restaurants"
-Output:
-{
-    "entities": [
-        {"name": "shellfish allergy", "type": "Health"},
-        {"name": "shellfish", "type": "Food"},
-        {"name": "vegan restaurants", "type": "Venue"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "shellfish allergy", "type": "HAS"},
-        {"from": "shellfish allergy", "to": "shellfish", "type": "ALLERGIC_TO"},
-        {"from": "Person", "to": "vegan restaurants", "type": "PREFERS"}
-    ]
-}
+    pydantic-ai exposes it as `output` (current) or `data` (older releases). The
+    installed version doesn't change at runtime, so this is probed once and the
+    returned getter is reused for every message.
 
-Input: "My dentist Dr. Miller is at 123 Oak Street and I see him every 6 months"
-Output:
-{
-    "entities": [
-        {"name": "Dr. Miller", "type": "Person"},
-        {"name": "dentist", "type": "Health"},
-        {"name": "123 Oak Street", "type": "Address"},
-        {"name": "every 6 months", "type": "Temporal"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "Dr. Miller", "type": "SEEING_DOCTOR"},
-        {"from": "Dr. Miller", "to": "dentist", "type": "WORKS_AS"},
-        {"from": "Dr. Miller", "to": "123 Oak Street", "type": "LOCATED_AT"},
-        {"from": "Person", "to": "Dr. Miller", "type": "VISITS"},
-        {"from": "Person", "to": "every 6 months", "type": "VISITS_FREQUENCY"}
-    ]
-}
+    Args:
+        result: A result returned by Agent.run()
 
-Input: "I have a Netflix subscription that costs $15.99 per month and renews on the 5th"
-Output:
-{
-    "entities": [
-        {"name": "Netflix subscription", "type": "Service"},
-        {"name": "Netflix", "type": "Organization"},
-        {"name": "$15.99 per month", "type": "Transaction"},
-        {"name": "5th of each month", "type": "Temporal"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "Netflix subscription", "type": "SUBSCRIBED_TO"},
-        {"from": "Netflix subscription", "to": "Netflix", "type": "PROVIDED_BY"},
-        {"from": "Netflix subscription", "to": "$15.99 per month", "type": "COSTS"},
-        {"from": "Netflix subscription", "to": "5th of each month", "type": "RENEWS_ON"}
-    ]
-}
+    Returns:
+        Callable that extracts the response from a result
+    """
+    if isinstance(result, str):
+        return str
+    for attr in ('output', 'data'):
+        if hasattr(result, attr):
+            return operator.attrgetter(attr)
+    return str
 
-Input: "I'm learning Spanish using Duolingo for my trip to Barcelona next summer"
-Output:
-{
-    "entities": [
-        {"name": "Spanish", "type": "Skill"},
-        {"name": "Duolingo", "type": "Tool"},
-        {"name": "Barcelona", "type": "Location"},
-        {"name": "next summer", "type": "Temporal"},
-        {"name": "trip to Barcelona", "type": "Event"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "Spanish", "type": "LEARNING"},
-        {"from": "Person", "to": "Duolingo", "type": "USES_TOOL"},
-        {"from": "Duolingo", "to": "Spanish", "type": "TEACHES"},
-        {"from": "Person", "to": "trip to Barcelona", "type": "PLANNING"},
-        {"from": "trip to Barcelona", "to": "Barcelona", "type": "DESTINATION"},
-        {"from": "trip to Barcelona", "to": "next summer", "type": "SCHEDULED_FOR"}
-    ]
-}
 
-Input: "I ordered a standing desk from Amazon for $450, order #12345, arriving Friday"
-Output:
-{
-    "entities": [
-        {"name": "standing desk", "type": "Product"},
-        {"name": "Amazon", "type": "Organization"},
-        {"name": "$450", "type": "Transaction"},
-        {"name": "order #12345", "type": "Transaction"},
-        {"name": "Friday", "type": "Temporal"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "standing desk", "type": "ORDERED"},
-        {"from": "standing desk", "to": "Amazon", "type": "PURCHASED_FROM"},
-        {"from": "standing desk", "to": "$450", "type": "COSTS"},
-        {"from": "standing desk", "to": "order #12345", "type": "ORDER_NUMBER"},
-        {"from": "standing desk", "to": "Friday", "type": "ARRIVING_ON"}
-    ]
-}
+@lru_cache(maxsize=1)
+def _get_http_client() -> httpx.AsyncClient:
+    """
+    Get the process-wide HTTP client for OpenAI requests.
 
-Input: "My goal is to run a marathon by December, currently training 4 days a week"
-Output:
-{
-    "entities": [
-        {"name": "run a marathon", "type": "Goal"},
-        {"name": "marathon", "type": "Event"},
-        {"name": "December", "type": "Temporal"},
-        {"name": "training", "type": "Habit"},
-        {"name": "4 days a week", "type": "Temporal"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "run a marathon", "type": "WORKING_TOWARDS"},
-        {"from": "run a marathon", "to": "December", "type": "TARGET_DATE"},
-        {"from": "Person", "to": "training", "type": "DOING"},
-        {"from": "training", "to": "4 days a week", "type": "FREQUENCY"},
-        {"from": "training", "to": "run a marathon", "type": "PREPARES_FOR"}
-    ]
-}
+    Uses the aiohttp transport when httpx-aiohttp is installed, with a connection
+    pool sized for many concurrent streaming requests.
 
-Input: "I watch The Office every night before bed, it helps me relax"
-Output:
-{
-    "entities": [
-        {"name": "The Office", "type": "Media"},
-        {"name": "evening routine", "type": "Habit"},
-        {"name": "relaxation", "type": "Goal"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "The Office", "type": "WATCHES"},
-        {"from": "The Office", "to": "evening routine", "type": "PART_OF"},
-        {"from": "The Office", "to": "relaxation", "type": "HELPS_WITH"}
-    ]
-}
+    Returns:
+        Shared httpx.AsyncClient
+    """
+    return httpx.AsyncClient(
+        transport=AiohttpTransport() if AiohttpTransport is not None else None,
+        limits=httpx.Limits(max_connections=256, max_keepalive_connections=128),
+        timeout=60,
+    )
 
-Input: "I take my medication Lipitor 20mg every morning with breakfast"
-Output:
-{
-    "entities": [
-        {"name": "Lipitor 20mg", "type": "Health"},
-        {"name": "medication routine", "type": "Habit"},
-        {"name": "every morning", "type": "Temporal"},
-        {"name": "breakfast", "type": "Event"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "Lipitor 20mg", "type": "TAKES_MEDICATION"},
-        {"from": "Lipitor 20mg", "to": "every morning", "type": "TAKEN_AT"},
-        {"from": "Lipitor 20mg", "to": "breakfast", "type": "TAKEN_WITH"}
-    ]
-}
 
-Input: "My brother Mark lives in Seattle and works as a software engineer at Microsoft"
-Output:
-{
-    "entities": [
-        {"name": "Mark", "type": "Person"},
-        {"name": "Seattle", "type": "Location"},
-        {"name": "software engineer", "type": "Skill"},
-        {"name": "Microsoft", "type": "Organization"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "Mark", "type": "SIBLING_OF"},
-        {"from": "Mark", "to": "Seattle", "type": "LIVES_IN"},
-        {"from": "Mark", "to": "software engineer", "type": "WORKS_AS"},
-        {"from": "Mark", "to": "Microsoft", "type": "WORKS_AT"}
-    ]
-}
+@lru_cache(maxsize=8)
+def _build_agent(model: str, prompt_template: str) -> Agent:
+    """
+    Build (once per model/template pair) the Pydantic AI Agent.
 
-Input: "I play tennis twice a week at Riverside Courts with my friend Tom"
-Output:
-{
-    "entities": [
-        {"name": "tennis", "type": "Hobby"},
-        {"name": "twice a week", "type": "Temporal"},
-        {"name": "Riverside Courts", "type": "Venue"},
-        {"name": "Tom", "type": "Person"}
-    ],
-    "relationships": [
-        {"from": "Person", "to": "tennis", "type": "PLAYS"},
-        {"from": "tennis", "to": "twice a week", "type": "FREQUENCY"},
-        {"from": "tennis", "to": "Riverside Courts", "type": "PLAYED_AT"},
-        {"from": "Person", "to": "Tom", "type": "PLAYS_WITH"},
-        {"from": "Person", "to": "Tom", "type": "FRIENDS_WITH"}
-    ]
-}
+    Requests carry an OpenAI prompt_cache_key derived from the template, so every
+    turn that shares this static system prompt is routed to the same prefix cache.
+    OpenAI models share one pooled HTTP client (see _get_http_client).
 
-Extract all entities and relationships from the conversation. Return valid JSON only.
-"""
+    Args:
+        model: Pydantic AI model string (e.g. 'openai:gpt-4o-mini')
+        prompt_template: Name of the system prompt template
 
-CUSTOM_UPDATE_MEMORY_PROMPT = """You are a smart memory manager which controls the memory of a system.
-You can perform four operations: (1) add into the memory, (2) update the memory, (3) delete from the memory, and (4) no change.
-
-Based on the above four operations, the memory will change.
-
-Compare newly retrieved facts with the existing memory. For each new fact, decide whether to:
-- ADD: Add it to the memory as a new element
-- UPDATE: Update an existing memory element
-- DELETE: Delete an existing memory element
-- NONE: Make no change (if the fact is already present or irrelevant)
-
-**CRITICAL RULES FOR PRESERVING DETAIL:**
-1. ALWAYS keep the fact with MORE specificity and detail
-2. NEVER simplify or generalize location information (neighborhoods, sides of town, districts, addresses)
-3. When comparing similar facts, keep the one that contains MORE information, not less
-4. "Lives on north side of Indianapolis" is MORE detailed than "Lives in Indianapolis" - KEEP THE DETAILED VERSION
-5. "Office near 5th and Main" is MORE detailed than "Office downtown" - KEEP THE DETAILED VERSION
-6. If both old and new facts have different details, COMBINE them into one fact with all details
-
-There are specific guidelines to select which operation to perform:
-
-1. **Add**: If the retrieved facts contain new information not present in the memory, then you have to add it by generating a new ID in the id field.
-- **Example**:
-    - Old Memory:
-        [
-            {
-                "id" : "0",
-                "text" : "User is a software engineer"
-            }
-        ]
-    - Retrieved facts: ["Name is John"]
-    - New Memory:
-        {
-            "memory" : [
-                {
-                    "id" : "0",
-                    "text" : "User is a software engineer",
-                    "event" : "NONE"
-                },
-                {
-                    "id" : "1",
-                    "text" : "Name is John",
-                    "event" : "ADD"
-                }
-            ]
-
-        }
-
-2. **Update**: If the retrieved facts contain information that is already present in the memory but the information is totally different, then you have to update it.
-**CRITICAL**: If the retrieved fact contains information that conveys the same thing as the elements present in the memory, then you MUST keep the fact which has the MOST SPECIFIC information and detail.
-Example (a) -- if the memory contains "User likes to play cricket" and the retrieved fact is "Loves to play cricket with friends", then update the memory with the retrieved facts because it adds "with friends".
-Example (b) -- if the memory contains "Likes cheese pizza" and the retrieved fact is "Loves cheese pizza", then you do not need to update it because they convey the same information with the same level of detail.
-**Example (c) -- if the memory contains "Lives on north side of Indianapolis" and the retrieved fact is "Lives in Indianapolis", DO NOT UPDATE because the existing memory has MORE detail (specifies "north side"). Keep the existing detailed memory.**
-**Example (d) -- if the memory contains "Lives in Indianapolis" and the retrieved fact is "Lives on north side of Indianapolis", UPDATE to the more detailed version because it adds neighborhood specificity.**
-If the direction is to update the memory, then you have to update it.
-Please keep in mind while updating you have to keep the same ID.
-Please note to return the IDs in the output from the input IDs only and do not generate any new ID.
-- **Example**:
-    - Old Memory:
-        [
-            {
-                "id" : "0",
-                "text" : "Lives on north side of Indianapolis"
-            },
-            {
-                "id" : "1",
-                "text" : "User is a software engineer"
-            },
-            {
-                "id" : "2",
-                "text" : "User likes to play cricket"
-            }
-        ]
-    - Retrieved facts: ["Lives in Indianapolis", "Loves to play cricket with friends"]
-    - New Memory:
-        {
-        "memory" : [
-                {
-                    "id" : "0",
-                    "text" : "Lives on north side of Indianapolis",
-                    "event" : "NONE"
-                },
-                {
-                    "id" : "1",
-                    "text" : "User is a software engineer",
-                    "event" : "NONE"
-                },
-                {
-                    "id" : "2",
-                    "text" : "Loves to play cricket with friends",
-                    "event" : "UPDATE",
-                    "old_memory" : "User likes to play cricket"
-                }
-            ]
-        }
-
-
-3. **Delete**: If the retrieved facts contain information that contradicts the information present in the memory, then you have to delete it. Or if the direction is to delete the memory, then you have to delete it.
-Please note to return the IDs in the output from the input IDs only and do not generate any new ID.
-- **Example**:
-    - Old Memory:
-        [
-            {
-                "id" : "0",
-                "text" : "Name is John"
-            },
-            {
-                "id" : "1",
-                "text" : "Loves cheese pizza"
-            }
-        ]
-    - Retrieved facts: ["Dislikes cheese pizza"]
-    - New Memory:
-        {
-        "memory" : [
-                {
-                    "id" : "0",
-                    "text" : "Name is John",
-                    "event" : "NONE"
-                },
-                {
-                    "id" : "1",
-                    "text" : "Loves cheese pizza",
-                    "event" : "DELETE"
-                }
-        ]
-        }
-
-4. **No Change**: If the retrieved facts contain information that is already present in the memory, then you do not need to make any changes.
-- **Example**:
-    - Old Memory:
-        [
-            {
-                "id" : "0",
-                "text" : "Name is John"
-            },
-            {
-                "id" : "1",
-                "text" : "Loves cheese pizza"
-            }
-        ]
-    - Retrieved facts: ["Name is John"]
-    - New Memory:
-        {
-        "memory" : [
-                {
-                    "id" : "0",
-                    "text" : "Name is John",
-                    "event" : "NONE"
-                },
-                {
-                    "id" : "1",
-                    "text" : "Loves cheese pizza",
-                    "event" : "NONE"
-                }
-            ]
-        }
-"""
+    Returns:
+        Shared Agent instance
+    """
+    provider_name, _, model_name = model.partition(':')
+    if provider_name == 'openai' and OpenAIProvider is not None:
+        agent_model = OpenAIModel(model_name, provider=OpenAIProvider(http_client=_get_http_client()))
+    else:
+        agent_model = model
+
+    return Agent(
+        model=agent_model,
+        deps_type=HybridMemoryManager,
+        tools=[search_memory],
+        system_prompt=get_system_prompt(prompt_template),
+        model_settings=ModelSettings(extra_body={"prompt_cache_key": f"pydantic-agent:{prompt_template}"}),
+    )
+
+
+@lru_cache(maxsize=8)
+def _build_memory(
+    mem0_config_json: str,
+    neo4j_uri: str,
+    neo4j_username: str,
+    neo4j_password: str,
+    openai_api_key: str,
+) -> HybridMemoryManager:
+    """
+    Build (once per configuration) the Hybrid Memory Manager.
+
+    The mem0 config is passed as a sorted JSON string so it can be used as a cache key.
+
+    Returns:
+        Shared HybridMemoryManager instance (not initialized yet)
+    """
+    return HybridMemoryManager(
+        mem0_config=json.loads(mem0_config_json),
+        neo4j_uri=neo4j_uri,
+        neo4j_username=neo4j_username,
+        neo4j_password=neo4j_password,
+        openai_api_key=openai_api_key
+    )
 
 
 class PydanticAIAgent:
@@ -977,22 +491,15 @@ class PydanticAIAgent:
 
         # Use OpenAI GPT-4o-mini for better instruction following
         # This provides more reliable context usage than Ollama models
-        self.model = "openai:gpt-4o-mini"
+        self.model = AGENT_MODEL
 
         # Set OpenAI API key and base URL for Pydantic AI
         # Ensure we use real OpenAI API, not Ollama's OpenAI-compatible endpoint
-        import os
         os.environ['OPENAI_API_KEY'] = config.OPENAI_GRAPH_API_KEY
         os.environ['OPENAI_BASE_URL'] = 'https://api.openai.com/v1'
 
-        # Get system prompt
-        system_prompt = get_system_prompt(config.AGENT_PROMPT_TEMPLATE)
-
-        # Initialize Pydantic AI Agent
-        self.agent = Agent(
-            model=self.model,
-            system_prompt=system_prompt,
-        )
+        # Pydantic AI Agent is shared by every PydanticAIAgent using the same model/prompt
+        self.agent = _build_agent(self.model, config.AGENT_PROMPT_TEMPLATE)
 
         # Initialize Mem0 for long-term memory
         self.memory = self._initialize_memory()
@@ -1000,12 +507,36 @@ class PydanticAIAgent:
         # Initialize Langfuse for observability
         self.langfuse = self._initialize_langfuse()
 
+        # Semantic response cache (Redis) - optional, off by default
+        self.response_cache = self._initialize_response_cache()
+
         # Initialize Guardrails - disabled for now
         # self.guard = self._initialize_guardrails()
         self.guard = None
 
-        # Session metadata
-        self.session_metadata = create_conversation_metadata(config.MEM0_USER_ID)
+        # Session metadata - built once and the same dict is passed to every memory.add()
+        self.session_metadata: ConversationMetadata = create_conversation_metadata(config.MEM0_USER_ID)
+
+        # Background memory writers - started lazily on the first save, once an event loop is running
+        self._save_queue: asyncio.Queue[tuple[str, str]] = asyncio.Queue(maxsize=SAVE_QUEUE_MAXSIZE)
+        self._save_workers: list[asyncio.Task] = []
+
+        # Timezone found in memory per user: user_id -> (timezone, monotonic time cached)
+        self._timezone_cache: dict[str, tuple[str, float]] = {}
+        # Users whose full memory dump has already been scanned for a location (get_all is O(n))
+        self._timezone_fallback_done: set[str] = set()
+
+        # System clock offset from NTP, refreshed in the background (see _now_utc)
+        self._ntp_offset: float = 0.0
+        self._ntp_expiry: float = 0.0
+        self._ntp_refresh_task: Optional[asyncio.Task] = None
+
+        # Rendered time context per timezone for the current minute
+        self._time_context_cache: dict[str, str] = {}
+        self._time_context_minute: Optional[int] = None
+
+        # Response getter for Agent.run() results, bound on the first message
+        self._unwrap_result: Optional[Callable[[Any], str]] = None
 
         logger.info("Agent initialization complete!")
 
@@ -1049,24 +580,24 @@ class PydanticAIAgent:
                         "embedding_dims": 768,
                     }
                 },
-                "custom_fact_extraction_prompt": CUSTOM_FACT_EXTRACTION_PROMPT,
-                "custom_update_memory_prompt": CUSTOM_UPDATE_MEMORY_PROMPT,
+                "custom_fact_extraction_prompt": get_fact_extraction_prompt(),
+                "custom_update_memory_prompt": get_update_memory_prompt(),
             }
 
-            # Create hybrid memory manager
-            hybrid_memory = HybridMemoryManager(
-                mem0_config=mem0_config,
-                neo4j_uri=config.NEO4J_URI,
-                neo4j_username=config.NEO4J_USERNAME,
-                neo4j_password=config.NEO4J_PASSWORD,
-                openai_api_key=config.OPENAI_GRAPH_API_KEY
+            # Reuse the hybrid memory manager already built for an identical config
+            hybrid_memory = _build_memory(
+                json.dumps(mem0_config, sort_keys=True),
+                config.NEO4J_URI,
+                config.NEO4J_USERNAME,
+                config.NEO4J_PASSWORD,
+                config.OPENAI_GRAPH_API_KEY,
             )
 
-            logger.info("Hybrid Memory Manager created (not initialized yet - call initialize_memory_async())")
+            logger.info("Hybrid Memory Manager ready (call initialize_memory_async() before use)")
             return hybrid_memory
 
         except Exception as e:
-            logger.error(f"Failed to create Hybrid Memory Manager: {e}")
+            logger.error("Failed to create Hybrid Memory Manager: %s", e)
             print_system_message(f"Warning: Memory system unavailable - {e}", "yellow")
             return None
 
@@ -1082,12 +613,37 @@ class PydanticAIAgent:
         try:
             logger.info("Initializing hybrid memory (async)...")
             await self.memory.initialize()
+            await self.memory.warmup()
             logger.info("Hybrid memory initialized successfully!")
         except Exception as e:
-            logger.error(f"Failed to initialize hybrid memory: {e}", exc_info=True)
+            logger.error("Failed to initialize hybrid memory: %s", e, exc_info=True)
             self.memory = None
 
-    def _initialize_langfuse(self) -> Optional[Langfuse]:
+    async def warmup(self) -> None:
+        """
+        Do first-use work up front so the first user message is as fast as later ones.
+
+        Opens the OpenAI connection with a 1-token request, measures the NTP clock offset,
+        and primes the timezone cache (and the mem0 embedder) with the timezone lookup.
+        The memory databases are warmed in initialize_memory_async. Failures are logged
+        and ignored - the same work simply happens on the first message instead.
+        """
+        async def ping_model() -> None:
+            await self.agent.run("ping", deps=None, model_settings=ModelSettings(max_tokens=1))
+
+        logger.info("Warming up agent...")
+        results = await asyncio.gather(
+            ping_model(),
+            self._refresh_ntp_offset(),
+            self._get_user_timezone(),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning("Warmup step failed: %s", result)
+        logger.info("Warmup complete")
+
+    def _initialize_langfuse(self) -> Optional["Langfuse"]:
         """
         Initialize Langfuse for observability
 
@@ -1103,19 +659,79 @@ class PydanticAIAgent:
             return None
 
         try:
+            from langfuse import Langfuse
+
+            # Spans are queued and sent by Langfuse's background exporter in batches of up to
+            # 50 or every 5 seconds, rather than posting per turn
             langfuse = Langfuse(
                 public_key=config.LANGFUSE_PUBLIC_KEY,
                 secret_key=config.LANGFUSE_SECRET_KEY,
                 host=config.LANGFUSE_HOST,
+                flush_at=50,
+                flush_interval=5.0,
             )
             logger.info("Langfuse initialized successfully")
             return langfuse
 
         except Exception as e:
-            logger.error(f"Failed to initialize Langfuse: {e}")
+            logger.error("Failed to initialize Langfuse: %s", e)
             print_system_message(f"Warning: Observability unavailable - {e}", "yellow")
             return None
 
+    def _initialize_response_cache(self) -> Optional[SemanticCache]:
+        """
+        Initialize the Redis semantic response cache
+
+        Messages are embedded with the same embedder mem0 uses, so the cache needs memory.
+
+        Returns:
+            SemanticCache instance or None if disabled/failed
+        """
+        if not config.SEMANTIC_CACHE_ENABLED:
+            return None
+
+        if not self.memory:
+            logger.warning("Semantic cache needs hybrid memory for embeddings, skipping")
+            return None
+
+        try:
+            cache = SemanticCache(
+                redis_url=config.REDIS_URL,
+                embed=lambda text: self.memory.mem0.embedding_model.embed(text, "search"),
+                threshold=config.SEMANTIC_CACHE_THRESHOLD,
+                ttl=config.SEMANTIC_CACHE_TTL,
+            )
+            logger.info("Semantic response cache initialized")
+            return cache
+
+        except Exception as e:
+            logger.error("Failed to initialize semantic cache: %s", e)
+            return None
+
+    async def _lookup_cached_response(self, user_input: str) -> tuple[Optional[str], Optional[bytes]]:
+        """
+        Look up a cached response for a similar earlier message.
+
+        Replies to messages about the time/date or a location depend on the clock and
+        the user's timezone, neither of which is part of the cache key, so those turns
+        are never served from (or stored in) the cache.
+
+        Args:
+            user_input: Sanitized user message
+
+        Returns:
+            (cached response or None, message embedding to store the new response under)
+        """
+        if not self.response_cache or not self.memory or not self.memory.mem0:
+            return None, None
+        if TIME_SENSITIVE_PATTERN.search(user_input.lower()) or _mentions_location(user_input):
+            return None, None
+
+        embedding = await self.response_cache.embed(user_input)
+        if embedding is None:
+            return None, None
+        return await self.response_cache.lookup(config.MEM0_USER_ID, embedding), embedding
+
     # def _initialize_guardrails(self) -> Optional[Guard]:
     #     """
     #     Initialize Guardrails AI
@@ -1147,12 +763,14 @@ class PydanticAIAgent:
     #         print_system_message(f"Warning: Guardrails unavailable - {e}", "yellow")
     #         return None
 
-    def _get_ntp_time(self) -> Optional[float]:
+    def _get_ntp_offset(self) -> Optional[float]:
         """
-        Get current time from NTP server (us.pool.ntp.org).
+        Measure the system clock offset against an NTP server (us.pool.ntp.org).
+
+        Blocking - call through asyncio.to_thread.
 
         Returns:
-            Unix timestamp from NTP server, or None if NTP query fails
+            Seconds to add to the system time, or None if NTP query fails
         """
         if ntplib is None:
             logger.warning("ntplib not available. Using system time as fallback.")
@@ -1161,17 +779,14 @@ class PydanticAIAgent:
         try:
             ntp_client = ntplib.NTPClient()
 
-            # Query US NTP pool with 3 second timeout
-            response = ntp_client.request('us.pool.ntp.org', version=3, timeout=3)
+            # Query US NTP pool with 2 second timeout
+            response = ntp_client.request('us.pool.ntp.org', version=3, timeout=2)
 
-            # Get the NTP time
-            ntp_time = response.tx_time
-
-            logger.info(f"Successfully synced with NTP server us.pool.ntp.org")
-            return ntp_time
+            logger.info("Successfully synced with NTP server us.pool.ntp.org (offset %+.3fs)", response.offset)
+            return response.offset
 
         except Exception as e:
-            logger.warning(f"Failed to sync with NTP server: {e}. Using system time as fallback.")
+            logger.warning("Failed to sync with NTP server: %s. Using system time as fallback.", e)
             return None
 
     async def _get_user_timezone(self, location_context: dict | None = None) -> str:
@@ -1195,40 +810,44 @@ class PydanticAIAgent:
             timezone_str = location_context['timezone']
             try:
                 # Validate the timezone
-                pytz.timezone(timezone_str)
-                logger.info(f"Using timezone from IP geolocation: {timezone_str}")
+                _get_tz(timezone_str)
+                logger.info("Using timezone from IP geolocation: %s", timezone_str)
                 return timezone_str
-            except pytz.exceptions.UnknownTimeZoneError:
-                logger.warning(f"Invalid timezone from IP geolocation: {timezone_str}, falling back to memory")
+            except (ZoneInfoNotFoundError, ValueError):
+                logger.warning("Invalid timezone from IP geolocation: %s, falling back to memory", timezone_str)
 
         # PRIORITY 2 & 3: Fall back to memory-based timezone detection
         if not self.memory:
             return 'UTC'
 
-        # Mapping of common US cities to their IANA timezones
-        city_to_timezone = {
-            'new york': 'America/New_York',
-            'nyc': 'America/New_York',
-            'boston': 'America/New_York',
-            'philadelphia': 'America/New_York',
-            'washington': 'America/New_York',
-            'miami': 'America/New_York',
-            'atlanta': 'America/New_York',
-            'chicago': 'America/Chicago',
-            'indianapolis': 'America/Indiana/Indianapolis',
-            'dallas': 'America/Chicago',
-            'houston': 'America/Chicago',
-            'denver': 'America/Denver',
-            'phoenix': 'America/Phoenix',
-            'los angeles': 'America/Los_Angeles',
-            'la': 'America/Los_Angeles',
-            'san francisco': 'America/Los_Angeles',
-            'sf': 'America/Los_Angeles',
-            'seattle': 'America/Los_Angeles',
-            'portland': 'America/Los_Angeles',
-            'las vegas': 'America/Los_Angeles',
-        }
+        user_id = config.MEM0_USER_ID
+        cached = self._timezone_cache.get(user_id)
+        if cached is not None and time.monotonic() - cached[1] < TIMEZONE_CACHE_TTL:
+            return cached[0]
+
+        timezone_str = await self._lookup_timezone_in_memory()
+        if timezone_str is None:
+            # Lookup failed - don't cache, try again next message
+            return 'UTC'
+        self._timezone_cache[user_id] = (timezone_str, time.monotonic())
+        return timezone_str
+
+    def invalidate_timezone(self, user_id: Optional[str] = None) -> None:
+        """
+        Drop the cached timezone so the next message re-reads it from memory.
+
+        Args:
+            user_id: User whose timezone to drop (defaults to the configured user)
+        """
+        self._timezone_cache.pop(user_id or config.MEM0_USER_ID, None)
+
+    async def _lookup_timezone_in_memory(self) -> Optional[str]:
+        """
+        Find the user's timezone in hybrid memory.
 
+        Returns:
+            Timezone string, 'UTC' if memory holds no location, or None if the lookup failed
+        """
         try:
             # Search memory for timezone information
             logger.info("Searching for user timezone in memory...")
@@ -1246,43 +865,43 @@ class PydanticAIAgent:
             else:
                 memory_list = []
 
-            # Look for timezone patterns in memories
-            timezone_pattern = r'\b([A-Z][a-z]+/[A-Z][a-z_]+)\b'  # Matches "America/New_York" format
-
             for mem in memory_list:
-                if isinstance(mem, dict):
-                    mem_text = mem.get('memory', mem.get('text', str(mem)))
-                else:
-                    mem_text = str(mem)
+                mem_text = _memory_text(mem)
 
                 mem_text_lower = mem_text.lower()
 
                 # 1. Check if memory contains explicit timezone information
                 if 'timezone' in mem_text_lower or 'time zone' in mem_text_lower:
                     # Try to extract timezone string
-                    match = re.search(timezone_pattern, mem_text)
+                    match = TIMEZONE_PATTERN.search(mem_text)
                     if match:
                         timezone_str = match.group(1)
                         # Validate timezone
                         try:
-                            pytz.timezone(timezone_str)
-                            logger.info(f"Found explicit timezone in memory: {timezone_str}")
+                            _get_tz(timezone_str)
+                            logger.info("Found explicit timezone in memory: %s", timezone_str)
                             return timezone_str
-                        except pytz.exceptions.UnknownTimeZoneError:
-                            logger.warning(f"Invalid timezone found in memory: {timezone_str}")
+                        except (ZoneInfoNotFoundError, ValueError):
+                            logger.warning("Invalid timezone found in memory: %s", timezone_str)
                             continue
 
                 # 2. Check if memory contains a city name we can map to a timezone
-                for city, tz in city_to_timezone.items():
-                    if city in mem_text_lower:
-                        logger.info(f"Found city '{city}' in memory, mapping to timezone: {tz}")
-                        return tz
-
-            # Fallback: Try get_all() to retrieve all memories if search didn't find location
+                city = _find_city(mem_text_lower)
+                if city:
+                    tz = CITY_TO_TIMEZONE[city]
+                    logger.info("Found city '%s' in memory, mapping to timezone: %s", city, tz)
+                    return tz
+
+            # Fallback: Try get_all() to retrieve all memories if search didn't find location.
+            # Only once per user per process - locations saved later are found by the search above.
+            if config.MEM0_USER_ID in self._timezone_fallback_done:
+                logger.info("No valid timezone found in memory, using UTC")
+                return 'UTC'
+            self._timezone_fallback_done.add(config.MEM0_USER_ID)
             logger.info("Search didn't find timezone, trying get_all() as fallback...")
             try:
                 # Access mem0 directly for get_all (not available in hybrid interface)
-                all_memories = self.memory.mem0.get_all(user_id=config.MEM0_USER_ID) if self.memory.mem0 else None
+                all_memories = await asyncio.to_thread(self.memory.mem0.get_all, user_id=config.MEM0_USER_ID) if self.memory.mem0 else None
                 if all_memories:
                     if isinstance(all_memories, dict):
                         all_memory_list = all_memories.get('results', [])
@@ -1292,56 +911,107 @@ class PydanticAIAgent:
                         all_memory_list = []
 
                     for mem in all_memory_list:
-                        if isinstance(mem, dict):
-                            mem_text = mem.get('memory', mem.get('text', str(mem)))
-                        else:
-                            mem_text = str(mem)
+                        mem_text = _memory_text(mem)
 
                         mem_text_lower = mem_text.lower()
 
                         # Check for city names in all memories
-                        for city, tz in city_to_timezone.items():
-                            if city in mem_text_lower:
-                                logger.info(f"Found city '{city}' in fallback memory check, mapping to timezone: {tz}")
-                                return tz
+                        city = _find_city(mem_text_lower)
+                        if city:
+                            tz = CITY_TO_TIMEZONE[city]
+                            logger.info("Found city '%s' in fallback memory check, mapping to timezone: %s", city, tz)
+                            return tz
 
                 logger.info("No valid timezone found in all memories")
             except Exception as fallback_error:
-                logger.warning(f"Fallback memory retrieval failed: {fallback_error}")
+                logger.warning("Fallback memory retrieval failed: %s", fallback_error)
 
             logger.info("No valid timezone found in memory, using UTC")
             return 'UTC'
 
         except Exception as e:
-            logger.error(f"Error retrieving timezone from memory: {e}", exc_info=True)
-            return 'UTC'
+            logger.error("Error retrieving timezone from memory: %s", e)
+            return None
 
-    def _get_current_time_context(self, timezone_str: str = 'UTC') -> str:
+    async def _refresh_ntp_offset(self) -> None:
+        """
+        Re-measure the NTP clock offset in a worker thread.
+
+        A successful sync is kept for NTP_OFFSET_TTL seconds; a failed one keeps the
+        previous offset and is retried after NTP_RETRY_INTERVAL seconds.
+        """
+        offset = await asyncio.to_thread(self._get_ntp_offset)
+        if offset is not None:
+            self._ntp_offset = offset
+            self._ntp_expiry = time.monotonic() + NTP_OFFSET_TTL
+        else:
+            self._ntp_expiry = time.monotonic() + NTP_RETRY_INTERVAL
+
+    def _now_utc(self) -> datetime:
+        """
+        Get the current UTC time: system time corrected by the last known NTP offset.
+
+        Never waits on NTP. When the offset is due, a refresh is started in the
+        background and this call uses the offset we already have.
+
+        Returns:
+            Timezone-aware current datetime in UTC
+        """
+        if time.monotonic() >= self._ntp_expiry and (
+            self._ntp_refresh_task is None or self._ntp_refresh_task.done()
+        ):
+            try:
+                self._ntp_refresh_task = asyncio.create_task(self._refresh_ntp_offset())
+            except RuntimeError:
+                pass  # No running event loop - keep the current offset
+        return datetime.fromtimestamp(time.time() + self._ntp_offset, tz=timezone.utc)
+
+    def _get_current_time_context(self, timezone_str: str = 'UTC', now_utc: Optional[datetime] = None) -> str:
         """
         Get current date and time context for this specific message.
-        Time is synced with us.pool.ntp.org for accuracy.
+        Time is corrected by the cached us.pool.ntp.org clock offset.
 
         Args:
             timezone_str: Timezone string (e.g., 'America/New_York' or 'UTC')
+            now_utc: Current UTC time if already fetched (see _now_utc)
 
         Returns:
             Time context string with current datetime in the specified timezone
         """
-        # Try to get NTP time first, fallback to system time
-        ntp_timestamp = self._get_ntp_time()
+        if now_utc is None:
+            now_utc = self._now_utc()
+
+        # The context only has minute resolution, so it is rendered once per (minute, timezone)
+        minute = int(now_utc.timestamp()) // 60
+        if minute != self._time_context_minute:
+            self._time_context_cache.clear()
+            self._time_context_minute = minute
+        time_context = self._time_context_cache.get(timezone_str)
+        if time_context is None:
+            time_context = self._render_time_context(timezone_str, now_utc)
+            self._time_context_cache[timezone_str] = time_context
+        return time_context
+
+    @staticmethod
+    def _render_time_context(timezone_str: str, now_utc: datetime) -> str:
+        """
+        Format the time context string for a timezone.
 
-        if ntp_timestamp:
-            # Use NTP time
-            now_utc = datetime.fromtimestamp(ntp_timestamp, tz=pytz.UTC)
-            time_source = "(synced with us.pool.ntp.org)"
-        else:
-            # Fallback to system time
-            now_utc = datetime.now(pytz.UTC)
-            time_source = "(system time)"
+        Args:
+            timezone_str: Timezone string (e.g., 'America/New_York' or 'UTC')
+            now_utc: Current UTC time
+
+        Returns:
+            Time context string with current datetime in the specified timezone
+        """
+        # Fast path: already in UTC, no timezone conversion needed
+        if timezone_str == 'UTC':
+            current_datetime = now_utc.strftime("%A, %B %d, %Y at %I:%M %p UTC")
+            return f"\n[Context - Current time available if needed]: {current_datetime} in UTC. Only mention time if the user asks about it or if it's directly relevant to their question.\n"
 
         # Convert to user's timezone
         try:
-            user_tz = pytz.timezone(timezone_str)
+            user_tz = _get_tz(timezone_str)
             now_local = now_utc.astimezone(user_tz)
 
             # Format datetime information
@@ -1351,98 +1021,29 @@ class PydanticAIAgent:
             return f"\n[Context - Current time available if needed]: {current_datetime} in {timezone_name}. Only mention time if the user asks about it or if it's directly relevant to their question.\n"
 
         except Exception as e:
-            logger.error(f"Error converting to timezone {timezone_str}: {e}")
+            logger.error("Error converting to timezone %s: %s", timezone_str, e)
             # Fallback to UTC
             current_datetime = now_utc.strftime("%A, %B %d, %Y at %I:%M %p UTC")
             return f"\n[Context - Current time available if needed]: {current_datetime}. Only mention time if the user asks about it or if it's directly relevant to their question.\n"
 
-    async def _get_memory_context(self, user_input: str) -> str:
-        """
-        Retrieve relevant memories based on user input using hybrid memory system.
-
-        Args:
-            user_input: Current user message
-
-        Returns:
-            Memory context string combining vector and graph results
-        """
-        if not self.memory:
-            return ""
-
-        try:
-            # Search hybrid memory (both vector and graph)
-            logger.info(f"Searching hybrid memory for query: '{user_input}'")
-            memories = await self.memory.search(
-                query=user_input,
-                user_id=config.MEM0_USER_ID,
-                limit=3
-            )
-            logger.info(f"Hybrid memory search returned: {len(memories.get('vector_results', []))} vector results, {len(memories.get('graph_results', []))} graph results")
-
-            # Hybrid memory returns {'vector_results': [...], 'graph_results': [...], 'combined_context': "..."}
-            # Use the pre-formatted combined_context from hybrid memory
-            if memories and isinstance(memories, dict):
-                combined_context = memories.get('combined_context', '')
-                if combined_context:
-                    logger.info(f"Memory context created from hybrid search")
-                    logger.info(f"Returning context (length={len(combined_context)}): {combined_context[:300]}...")
-                    return combined_context
-                else:
-                    logger.warning("No memories found in hybrid search - combined_context is empty")
-            else:
-                logger.warning("Invalid memory search result format")
-
-        except Exception as e:
-            logger.error(f"Error retrieving memories: {e}", exc_info=True)
-
-        return ""
-
-    async def _save_to_memory(self, user_input: str, agent_response: str) -> None:
-        """
-        Save conversation to hybrid long-term memory (mem0 + Graphiti)
-
-        Args:
-            user_input: User message
-            agent_response: Agent response
-        """
-        if not self.memory:
-            logger.warning("Memory not initialized, skipping save")
-            return
-
-        try:
-            logger.info(f"Attempting to save conversation to hybrid memory...")
-
-            # Save to both mem0 (vectors) and Graphiti (graph)
-            result = await self.memory.add(
-                messages=[
-                    {"role": "user", "content": user_input},
-                    {"role": "assistant", "content": agent_response}
-                ],
-                user_id=config.MEM0_USER_ID,
-                agent_id=config.MEM0_AGENT_ID,
-                metadata=self.session_metadata,
-                infer=True,  # Enable LLM-based fact extraction with custom prompt
-            )
-            logger.info(f"Conversation saved to hybrid memory. mem0 result: {result.get('mem0')}, graphiti result: {result.get('graphiti')}")
-
-        except Exception as e:
-            logger.error(f"Error saving to memory: {e}", exc_info=True)
-
-    async def _save_to_memory_async(self, user_input: str, agent_response: str) -> None:
+    async def _save_to_memory_async(self, user_input: str, agent_response: str) -> bool:
         """
         Async method for saving conversation to hybrid memory (mem0 + Graphiti).
-        Called as a background task to avoid blocking the response stream.
+        Called from the background save worker to avoid blocking the response.
 
         Args:
             user_input: User message
             agent_response: Agent response
+
+        Returns:
+            False if the save failed and may be retried, True otherwise
         """
         if not self.memory:
             logger.warning("Memory not initialized, skipping save")
-            return
+            return True
 
         try:
-            logger.info(f"Saving conversation to hybrid memory (async background task)...")
+            logger.info("Saving conversation to hybrid memory (async background task)...")
 
             # Directly await hybrid memory's async add() method
             # Per mem0 documentation, we pass the full conversation (both user and assistant messages)
@@ -1458,7 +1059,7 @@ class PydanticAIAgent:
                 infer=True,  # Enable LLM-based fact extraction with custom prompt
             )
 
-            logger.info(f"Hybrid memory add result: {result}")
+            logger.info("Hybrid memory add result: %s", result)
 
             # Log results from both systems
             if isinstance(result, dict):
@@ -1466,18 +1067,101 @@ class PydanticAIAgent:
                 if 'mem0' in result and result['mem0']:
                     mem0_result = result['mem0']
                     if isinstance(mem0_result, dict) and 'results' in mem0_result:
-                        logger.info(f"mem0 vector store: {len(mem0_result['results'])} memories")
+                        logger.info("mem0 vector store: %d memories", len(mem0_result['results']))
                     else:
-                        logger.info(f"mem0 result: {mem0_result}")
+                        logger.info("mem0 result: %s", mem0_result)
 
                 # Graphiti results (knowledge graph)
                 if 'graphiti' in result and result['graphiti']:
-                    logger.info(f"Graphiti graph result: {result['graphiti']}")
+                    logger.info("Graphiti graph result: %s", result['graphiti'])
+
+            logger.info("Conversation saved to hybrid memory successfully (background task completed)")
+
+            # A newly stored location may change the timezone we infer from memory
+            if _mentions_location(user_input):
+                self.invalidate_timezone()
 
-            logger.info(f"Conversation saved to hybrid memory successfully (background task completed)")
+            # Cached responses may be stale once mem0 added/updated/deleted memories
+            if self.response_cache and isinstance(result, dict):
+                mem0_result = result.get('mem0')
+                if isinstance(mem0_result, dict) and mem0_result.get('results'):
+                    await self.response_cache.invalidate(config.MEM0_USER_ID)
+            return True
 
         except Exception as e:
-            logger.error(f"Error saving to hybrid memory (async): {e}", exc_info=True)
+            logger.error("Error saving to hybrid memory (async): %s", e)
+            return False
+
+    def _enqueue_save(self, user_input: str, agent_response: str) -> None:
+        """
+        Queue a conversation turn for the background memory writer.
+
+        When the queue is full the oldest pending turn is dropped, so memory use stays
+        bounded under bursts.
+
+        Args:
+            user_input: User message
+            agent_response: Agent response
+        """
+        self._save_workers = [task for task in self._save_workers if not task.done()]
+        while len(self._save_workers) < config.MEM0_WRITE_WORKERS:
+            self._save_workers.append(asyncio.create_task(self._save_worker()))
+
+        try:
+            self._save_queue.put_nowait((user_input, agent_response))
+        except asyncio.QueueFull:
+            dropped_input, _ = self._save_queue.get_nowait()
+            self._save_queue.task_done()
+            logger.warning("Memory save queue full, dropping oldest turn: %.50s...", dropped_input)
+            self._save_queue.put_nowait((user_input, agent_response))
+
+    async def _save_worker(self) -> None:
+        """
+        Drain the save queue one turn at a time, retrying failed saves with exponential backoff.
+        """
+        while True:
+            user_input, agent_response = await self._save_queue.get()
+            try:
+                for attempt in range(1, SAVE_MAX_ATTEMPTS + 1):
+                    if await self._save_to_memory_async(user_input, agent_response):
+                        break
+                    if attempt < SAVE_MAX_ATTEMPTS:
+                        delay = SAVE_RETRY_BASE_DELAY * 2 ** (attempt - 1)
+                        logger.warning("Memory save attempt %d failed, retrying in %ss", attempt, delay)
+                        await asyncio.sleep(delay)
+                else:
+                    logger.error("Giving up on memory save after %d attempts", SAVE_MAX_ATTEMPTS)
+            finally:
+                self._save_queue.task_done()
+
+    async def shutdown(self, timeout: float = 30.0) -> None:
+        """
+        Flush pending memory saves and Langfuse spans, stop the background writers,
+        and close the semantic cache connection.
+
+        Args:
+            timeout: Maximum seconds to wait for the queue to drain
+        """
+        if self.langfuse:
+            # Send any spans still waiting for the next batch
+            await asyncio.to_thread(self.langfuse.flush)
+
+        if self._save_workers:
+            try:
+                await asyncio.wait_for(self._save_queue.join(), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Timed out with %d memory saves still pending", self._save_queue.qsize())
+
+            for task in self._save_workers:
+                task.cancel()
+            await asyncio.gather(*self._save_workers, return_exceptions=True)
+            self._save_workers = []
+
+        if self._ntp_refresh_task is not None and not self._ntp_refresh_task.done():
+            self._ntp_refresh_task.cancel()
+
+        if self.response_cache:
+            await self.response_cache.close()
 
     # def _validate_with_guardrails(self, text: str) -> bool:
     #     """
@@ -1500,6 +1184,28 @@ class PydanticAIAgent:
     #         logger.warning(f"Guardrails validation failed: {e}")
     #         return False
 
+    @staticmethod
+    def _build_full_message(user_input: str, time_context: str) -> str:
+        """
+        Build the per-turn user message.
+
+        The system prompt is fixed on the shared Agent, so it forms an identical
+        prefix on every request and provider-side prompt caching (OpenAI caches
+        repeated prefixes automatically) can hit. Only the current time (minute
+        resolution) is added per turn; memories are fetched by the search_memory
+        tool when the model needs them.
+
+        Args:
+            user_input: Sanitized user message
+            time_context: Current time context string (may be empty)
+
+        Returns:
+            Message to send to the agent
+        """
+        if not time_context:
+            return user_input
+        return f"{time_context}\n{user_input}"
+
     @observe()
     async def process_message(self, user_input: str) -> str:
         """
@@ -1513,55 +1219,54 @@ class PydanticAIAgent:
         """
         # Sanitize input
         user_input = sanitize_input(user_input)
+        if not user_input:
+            # Nothing left to answer - skip the memory lookups and the LLM call
+            return ""
 
         # Validate input with guardrails - disabled for now
         # if not self._validate_with_guardrails(user_input):
         #     return "I'm sorry, but I cannot process that message. Please rephrase your request."
 
-        # Get user's timezone from memory (async)
-        user_timezone = await self._get_user_timezone()
+        # Look up the user's timezone and check the response cache concurrently
+        user_timezone, (cached_response, cache_embedding) = await asyncio.gather(
+            self._get_user_timezone(),
+            self._lookup_cached_response(user_input),
+        )
+        if cached_response is not None:
+            # Still record the turn - the conversation happened even if the LLM didn't run
+            self._enqueue_save(user_input, cached_response)
+            return cached_response
 
         # Get current time context (fresh for this message, in user's timezone)
         time_context = self._get_current_time_context(user_timezone)
 
-        # Get memory context from hybrid memory (async)
-        memory_context = await self._get_memory_context(user_input)
-
-        # Prepare the full message with context
-        full_message = user_input
-        if time_context or memory_context:
-            context_parts = [time_context, memory_context]
-            combined_context = "".join([ctx for ctx in context_parts if ctx])
-            full_message = f"{combined_context}\n{user_input}"
-            logger.info(f"Full message with context (length={len(full_message)}): {full_message[:400]}...")
-        else:
-            logger.warning("No context added to message - both time_context and memory_context are empty")
+        # Prepare the user message (dynamic context only - system prompt stays static).
+        # Memories are not prepended; the agent calls the search_memory tool when it needs them.
+        full_message = self._build_full_message(user_input, time_context)
+        logger.info("Full message with context (length=%d): %.400s...", len(full_message), full_message)
 
         # Get response from agent
         try:
-            result = await self.agent.run(full_message)
-            # In pydantic-ai, result.output contains the response
-            if hasattr(result, 'output'):
-                response = result.output
-            elif hasattr(result, 'data'):
-                response = result.data
-            elif isinstance(result, str):
-                response = result
-            else:
-                # Fallback: convert to string
-                response = str(result)
+            result = await self.agent.run(full_message, deps=self.memory)
+            # In pydantic-ai, result.output contains the response (result.data in older versions)
+            if self._unwrap_result is None:
+                self._unwrap_result = _select_result_unwrapper(result)
+            response = self._unwrap_result(result)
 
             # Validate response with guardrails - disabled for now
             # if not self._validate_with_guardrails(response):
             #     response = "I apologize, but I need to rephrase my response. Let me try again."
 
-            # Save to hybrid memory (async)
-            await self._save_to_memory(user_input, response)
+            if cache_embedding is not None:
+                await self.response_cache.store(config.MEM0_USER_ID, cache_embedding, response)
+
+            # Save to hybrid memory in the background so the reply isn't held up by the write
+            self._enqueue_save(user_input, response)
 
             return response
 
         except Exception as e:
-            logger.error(f"Error processing message: {e}")
+            logger.error("Error processing message: %s", e)
             return f"I encountered an error: {str(e)}"
 
     async def process_message_stream(self, user_input: str, location_context: dict | None = None):
@@ -1577,47 +1282,68 @@ class PydanticAIAgent:
                              {city, state, country, timezone, latitude, longitude}
 
         Yields:
-            Individual tokens of the agent's response
+            Chunks of the agent's response (token deltas batched up to ~50 chars / 50 ms)
         """
         try:
             # Sanitize input
             user_input = sanitize_input(user_input)
+            if not user_input:
+                # Nothing left to answer - end the stream without touching memory or the LLM
+                return
 
             # Validate input with guardrails - disabled for now
             # if not self._validate_with_guardrails(user_input):
             #     yield "I'm sorry, but I cannot process that message."
             #     return
 
-            # Get user's timezone - prioritize location_context, fallback to memory (async)
-            user_timezone = await self._get_user_timezone(location_context)
+            # Get user's timezone (location_context first, then memory) and any cached response concurrently
+            user_timezone, (cached_response, cache_embedding) = await asyncio.gather(
+                self._get_user_timezone(location_context),
+                self._lookup_cached_response(user_input),
+            )
+            if cached_response is not None:
+                # Still record the turn - the conversation happened even if the LLM didn't run
+                self._enqueue_save(user_input, cached_response)
+                yield cached_response
+                return
 
             # Get current time context (fresh for this message, in user's timezone)
             time_context = self._get_current_time_context(user_timezone)
 
-            # Get memory context from hybrid memory (async)
-            memory_context = await self._get_memory_context(user_input)
+            # Prepare the user message (dynamic context only - system prompt stays static).
+            # Memories are not prepended; the agent calls the search_memory tool when it needs them.
+            full_message = self._build_full_message(user_input, time_context)
+            logger.info("[STREAM] Full message with context (length=%d): %.400s...", len(full_message), full_message)
 
-            # Prepare the full message with context
-            full_message = user_input
-            if time_context or memory_context:
-                context_parts = [time_context, memory_context]
-                combined_context = "".join([ctx for ctx in context_parts if ctx])
-                full_message = f"{combined_context}\n{user_input}"
-                logger.info(f"[STREAM] Full message with context (length={len(full_message)}): {full_message[:400]}...")
-            else:
-                logger.warning("[STREAM] No context added to message - both time_context and memory_context are empty")
-
-            logger.info(f"Streaming response for message: {user_input[:50]}...")
+            logger.info("Streaming response for message: %.50s...", user_input)
 
             # Stream response from agent
-            full_response = ""
-            async with self.agent.run_stream(full_message) as result:
-                # Stream text deltas (token by token)
+            chunks: list[str] = []
+            loop = asyncio.get_running_loop()
+            buf: list[str] = []
+            buf_len = 0
+            last_flush = loop.time()
+            async with self.agent.run_stream(full_message, deps=self.memory) as result:
+                # Stream text deltas, batched to cut per-token yield/SSE overhead
                 async for text in result.stream_text(delta=True):
-                    full_response += text
-                    yield text  # Yield each token as it arrives
+                    chunks.append(text)
+                    buf.append(text)
+                    buf_len += len(text)
+                    if buf_len >= STREAM_FLUSH_CHARS or loop.time() - last_flush >= STREAM_FLUSH_INTERVAL:
+                        yield "".join(buf)
+                        buf.clear()
+                        buf_len = 0
+                        last_flush = loop.time()
+
+            # Flush whatever is left after the last delta
+            if buf:
+                yield "".join(buf)
 
-            logger.info(f"Stream completed. Total length: {len(full_response)}")
+            full_response = "".join(chunks)
+            if cache_embedding is not None:
+                await self.response_cache.store(config.MEM0_USER_ID, cache_embedding, full_response)
+
+            logger.info("Stream completed. Total length: %d", len(full_response))
 
             # Validate response with guardrails - disabled for now
             # if not self._validate_with_guardrails(full_response):
@@ -1625,10 +1351,10 @@ class PydanticAIAgent:
 
             # Save complete response to memory asynchronously (non-blocking)
             # This runs in the background so it doesn't delay the stream completion signal
-            asyncio.create_task(self._save_to_memory_async(user_input, full_response))
+            self._enqueue_save(user_input, full_response)
 
         except Exception as e:
-            logger.error(f"Error during streaming: {e}", exc_info=True)
+            logger.error("Error during streaming: %s", e, exc_info=True)
             yield f"Error: {str(e)}"
 
     async def run_conversation_loop(self) -> None:
@@ -1640,7 +1366,8 @@ class PydanticAIAgent:
         while True:
             try:
                 # Get user input
-                user_input = input("You: ").strip()
+                # Read in a worker thread so background memory saves keep running while we wait
+                user_input = (await _read_line("You: ")).strip()
 
                 # Check for exit command
                 if is_exit_command(user_input):
@@ -1659,23 +1386,72 @@ class PydanticAIAgent:
                 # Print agent response
                 print_agent_message(response)
 
-            except KeyboardInterrupt:
+            except (KeyboardInterrupt, EOFError, asyncio.CancelledError):
+                # asyncio.run() delivers Ctrl-C as a cancellation of the main task; take it
+                # back so main() can still flush pending memory saves on the way out
+                task = asyncio.current_task()
+                if task is not None and task.cancelling():
+                    task.uncancel()
                 print_system_message("\n\nConversation interrupted. Goodbye! 👋")
                 break
 
             except Exception as e:
-                logger.error(f"Error in conversation loop: {e}")
+                logger.error("Error in conversation loop: %s", e)
                 print_error(str(e))
 
 
+def _read_line(prompt: str) -> "asyncio.Future[str]":
+    """
+    Read a line from stdin without blocking the event loop
+
+    Uses a daemon thread rather than asyncio.to_thread: a thread parked in input()
+    would otherwise keep the default executor (and interpreter exit) waiting for Enter.
+
+    Args:
+        prompt: Prompt to display
+
+    Returns:
+        Future resolving to the line read (or raising EOFError at end of input)
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def settle(line: Optional[str], error: Optional[BaseException]) -> None:
+        if future.done():
+            return  # Reader was cancelled (Ctrl-C) while the thread waited
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(line)
+
+    def read() -> None:
+        try:
+            result = (input(prompt), None)
+        except BaseException as e:
+            result = (None, e)
+        try:
+            loop.call_soon_threadsafe(settle, *result)
+        except RuntimeError:
+            pass  # Loop already closed (Enter pressed after shutdown)
+
+    threading.Thread(target=read, name="stdin-reader", daemon=True).start()
+    return future
+
+
 async def main():
     """Main entry point"""
     try:
         agent = PydanticAIAgent()
-        await agent.run_conversation_loop()
+        await agent.initialize_memory_async()
+        await agent.warmup()
+        try:
+            await agent.run_conversation_loop()
+        finally:
+            # Let pending memory saves finish before the event loop shuts down
+            await agent.shutdown()
 
     except Exception as e:
-        logger.error(f"Fatal error: {e}")
+        logger.error("Fatal error: %s", e)
         print_error(f"Failed to start agent: {e}")
         return 1
 
@@ -1683,5 +1459,5 @@ async def main():
 
 
 if __name__ == "__main__":
-    exit_code = asyncio.run(main())
+    exit_code = uvloop.run(main()) if uvloop else asyncio.run(main())
     exit(exit_code)
@@ -7,8 +7,8 @@ import asyncio
 from typing import Optional
 import httpx
 import re
-from datetime import datetime
-import pytz
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 try:
     import ntplib
 except ImportError:
@@ -1586,10 +1586,10 @@ class PydanticAIAgent:
             timezone_str = location_context['timezone']
             try:
                 # Validate the timezone
-                pytz.timezone(timezone_str)
+                ZoneInfo(timezone_str)
                 logger.info(f"Using timezone from IP geolocation: {timezone_str}")
                 return timezone_str
-            except pytz.exceptions.UnknownTimeZoneError:
+            except (ZoneInfoNotFoundError, ValueError):
                 logger.warning(f"Invalid timezone from IP geolocation: {timezone_str}, falling back to memory")
 
         # PRIORITY 2 & 3: Fall back to memory-based timezone detection
@@ -1656,10 +1656,10 @@ class PydanticAIAgent:
                         timezone_str = match.group(1)
                         # Validate timezone
                         try:
-                            pytz.timezone(timezone_str)
+                            ZoneInfo(timezone_str)
                             logger.info(f"Found explicit timezone in memory: {timezone_str}")
                             return timezone_str
-                        except pytz.exceptions.UnknownTimeZoneError:
+                        except (ZoneInfoNotFoundError, ValueError):
                             logger.warning(f"Invalid timezone found in memory: {timezone_str}")
                             continue
 
@@ -1723,16 +1723,16 @@ class PydanticAIAgent:
 
         if ntp_timestamp:
             # Use NTP time
-            now_utc = datetime.fromtimestamp(ntp_timestamp, tz=pytz.UTC)
+            now_utc = datetime.fromtimestamp(ntp_timestamp, tz=timezone.utc)
             time_source = "(synced with us.pool.ntp.org)"
         else:
             # Fallback to system time
-            now_utc = datetime.now(pytz.UTC)
+            now_utc = datetime.now(timezone.utc)
             time_source = "(system time)"
 
         # Convert to user's timezone
         try:
-            user_tz = pytz.timezone(timezone_str)
+            user_tz = ZoneInfo(timezone_str)
             now_local = now_utc.astimezone(user_tz)
 
             # Format datetime information
@@ -0,0 +1,61 @@
+"""
+Shared mem0 configurations for the test scripts
+
+The scripts talk to the development stack directly (pgvector in the postgres-memory
+container, Ollama on the LAN box), so these hold those fixed endpoints instead of
+reading config.py. The dicts are shared by every importer - build a new dict to
+change a key (e.g. {**OPENAI_MEM0_CONFIG, "custom_fact_extraction_prompt": ...}).
+"""
+import os
+
+OPENAI_API_KEY = os.environ.get("OPENAI_GRAPH_API_KEY", "")
+
+PGVECTOR_STORE = {
+    "provider": "pgvector",
+    "config": {
+        "dbname": "agent_memory",
+        "user": "postgres",
+        "password": "postgres",
+        "host": "postgres-memory",
+        "port": 5432,
+        "embedding_model_dims": 768,
+    }
+}
+
+OLLAMA_EMBEDDER = {
+    "provider": "ollama",
+    "config": {
+        "model": "nomic-embed-text:latest",
+        "ollama_base_url": "http://192.168.1.97:11434",
+        "embedding_dims": 768,
+    }
+}
+
+# gpt-4o-mini for extraction (used by the graph RAG suites)
+OPENAI_MEM0_CONFIG = {
+    "llm": {
+        "provider": "openai",
+        "config": {
+            "model": "gpt-4o-mini",
+            "temperature": 0.1,
+            "max_tokens": 4000,
+            "api_key": OPENAI_API_KEY,
+            "openai_base_url": "https://api.openai.com/v1",
+        }
+    },
+    "vector_store": PGVECTOR_STORE,
+    "embedder": OLLAMA_EMBEDDER,
+}
+
+# Local llama3.1:8b for extraction (used by the mem0 prompt experiments)
+OLLAMA_MEM0_CONFIG = {
+    "llm": {
+        "provider": "ollama",
+        "config": {
+            "model": "llama3.1:8b",
+            "ollama_base_url": "http://192.168.1.97:11434",
+        }
+    },
+    "vector_store": PGVECTOR_STORE,
+    "embedder": OLLAMA_EMBEDDER,
+}
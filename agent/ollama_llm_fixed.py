@@ -1,9 +1,13 @@
 """Fixed Ollama LLM client for mem0 that doesn't append extra JSON instructions"""
 
-from typing import Dict, List, Optional, Union
+import asyncio
+import json
+import operator
+from functools import singledispatch
+from typing import Any, AsyncIterator, Callable, ClassVar, Dict, List, Optional, Union
 
 try:
-    from ollama import Client
+    from ollama import AsyncClient, Client
 except ImportError:
     raise ImportError("The 'ollama' library is required. Please install it using 'pip install ollama'.")
 
@@ -11,39 +15,141 @@ from mem0.configs.llms.base import BaseLlmConfig
 from mem0.configs.llms.ollama import OllamaConfig
 from mem0.llms.base import LLMBase
 
+# Keep the model (and the KV cache for the unchanged system prompt prefix) loaded between
+# extractions instead of Ollama's 5 minute default
+KEEP_ALIVE = "30m"
+
+
+@singledispatch
+def _to_ollama_config(config):
+    """
+    Normalize a mem0 LLM config to an OllamaConfig.
+
+    Args:
+        config: None, a dict of OllamaConfig fields, a BaseLlmConfig or an OllamaConfig
+
+    Returns:
+        OllamaConfig (unknown types are passed through unchanged)
+    """
+    return config
+
+
+@_to_ollama_config.register(type(None))
+def _(config):
+    return OllamaConfig()
+
+
+@_to_ollama_config.register
+def _(config: dict):
+    return OllamaConfig(**config)
+
+
+@_to_ollama_config.register
+def _(config: BaseLlmConfig):
+    return OllamaConfig(
+        model=config.model,
+        temperature=config.temperature,
+        api_key=config.api_key,
+        max_tokens=config.max_tokens,
+        top_p=config.top_p,
+        top_k=config.top_k,
+        enable_vision=config.enable_vision,
+        vision_details=config.vision_details,
+        http_client_proxies=config.http_client,
+    )
+
+
+@_to_ollama_config.register
+def _(config: OllamaConfig):
+    return config
+
+
+def _select_content_getter(response: Any) -> Callable[[Any], str]:
+    """
+    Pick how to read the message content from an ollama chat response.
+
+    Older ollama releases return plain dicts, newer ones response objects. The
+    installed version doesn't change at runtime, so this is probed once and the
+    returned getter is reused for every response.
+
+    Args:
+        response: A response (or stream chunk) returned by Client.chat
+
+    Returns:
+        Callable that extracts the message content from a response
+    """
+    if isinstance(response, dict):
+        return lambda r: r["message"]["content"]
+    return operator.attrgetter("message.content")
+
 
 class FixedOllamaLLM(LLMBase):
     """
     Fixed Ollama LLM client that doesn't append extra JSON format instructions
     when a custom prompt is already provided.
+
+    generate_response() is the blocking call mem0 uses; agenerate_response() is the
+    same request on ollama's AsyncClient, so several can be awaited concurrently
+    (e.g. with asyncio.gather). The Ollama server only runs them in parallel when
+    started with OLLAMA_NUM_PARALLEL > 1 (and OLLAMA_MAX_LOADED_MODELS high enough
+    to keep the model loaded alongside the embedder).
+
+    Sync clients are shared per Ollama host by all instances, so HTTP keep-alive
+    connections survive re-instantiation; they live for the whole process. The
+    AsyncClient's connections belong to the event loop that opened them, so each
+    instance keeps its own and replaces it when called from a different loop
+    (e.g. a second asyncio.run in the test scripts).
     """
 
+    _CLIENT_POOL: ClassVar[Dict[str, Client]] = {}
+    # Set from the first response (see _select_content_getter)
+    _content_getter: ClassVar[Optional[Callable[[Any], str]]] = None
+
     def __init__(self, config: Optional[Union[BaseLlmConfig, OllamaConfig, Dict]] = None):
-        # Convert to OllamaConfig if needed
-        if config is None:
-            config = OllamaConfig()
-        elif isinstance(config, dict):
-            config = OllamaConfig(**config)
-        elif isinstance(config, BaseLlmConfig) and not isinstance(config, OllamaConfig):
-            # Convert BaseLlmConfig to OllamaConfig
-            config = OllamaConfig(
-                model=config.model,
-                temperature=config.temperature,
-                api_key=config.api_key,
-                max_tokens=config.max_tokens,
-                top_p=config.top_p,
-                top_k=config.top_k,
-                enable_vision=config.enable_vision,
-                vision_details=config.vision_details,
-                http_client_proxies=config.http_client,
-            )
-
-        super().__init__(config)
+        super().__init__(_to_ollama_config(config))
 
         if not self.config.model:
             self.config.model = "llama3.1:70b"
 
-        self.client = Client(host=self.config.ollama_base_url)
+        host = self.config.ollama_base_url
+        self.client = self._CLIENT_POOL.get(host)
+        if self.client is None:
+            self.client = self._CLIENT_POOL[host] = Client(host=host)
+        # Created on first async use, bound to that event loop (see _get_aclient)
+        self._aclient: Optional[AsyncClient] = None
+        self._aclient_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Request fields that are the same for every call (see _build_params)
+        self._base_params = {
+            "model": self.config.model,
+            # Options for Ollama (temperature, num_predict, top_p)
+            "options": {
+                "temperature": self.config.temperature,
+                "num_predict": self.config.max_tokens,
+                "top_p": self.config.top_p,
+            },
+            "keep_alive": KEEP_ALIVE,
+        }
+
+        # In-flight async requests keyed by their messages, shared by concurrent callers
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def _get_aclient(self) -> AsyncClient:
+        """Get the AsyncClient for the running event loop, creating it on a new loop."""
+        loop = asyncio.get_running_loop()
+        if self._aclient_loop is not loop:
+            self._aclient = AsyncClient(host=self.config.ollama_base_url)
+            self._aclient_loop = loop
+            # Tasks left over from a previous loop can't be awaited on this one
+            self._inflight.clear()
+        return self._aclient
+
+    @classmethod
+    def _get_content(cls, response) -> str:
+        """Get the message content from a response or stream chunk."""
+        if cls._content_getter is None:
+            cls._content_getter = _select_content_getter(response)
+        return cls._content_getter(response)
 
     def _parse_response(self, response, tools):
         """
@@ -56,11 +162,7 @@ class FixedOllamaLLM(LLMBase):
         Returns:
             str or dict: The processed response.
         """
-        # Get the content from response
-        if isinstance(response, dict):
-            content = response["message"]["content"]
-        else:
-            content = response.message.content
+        content = self._get_content(response)
 
         if tools:
             processed_response = {
@@ -73,6 +175,29 @@ class FixedOllamaLLM(LLMBase):
         else:
             return content
 
+    def _build_params(self, messages: List[Dict[str, str]], response_format=None) -> Dict:
+        """
+        Build the Ollama chat request.
+
+        Args:
+            messages (list): List of message dicts containing 'role' and 'content'.
+            response_format (str or object, optional): Format of the response. Defaults to "text".
+
+        Returns:
+            dict: Keyword arguments for Client.chat / AsyncClient.chat.
+        """
+        # NOTE: {"type": "json_object"} is deliberately ignored. We DON'T use Ollama's
+        # format="json" parameter because it doesn't enforce the specific schema from our
+        # custom prompt. Instead, we rely on the prompt examples to guide the model to the
+        # correct format. The custom prompt has detailed examples showing {"facts": [...]} format.
+        # A caller that knows its schema can pass {"type": "json_schema", "json_schema":
+        # {"schema": {...}}}, which Ollama (0.5+) enforces while decoding - no malformed
+        # output to retry.
+        if response_format and response_format.get("type") == "json_schema":
+            schema = response_format["json_schema"]["schema"]
+            return {**self._base_params, "messages": messages, "format": schema}
+        return {**self._base_params, "messages": messages}
+
     def generate_response(
         self,
         messages: List[Dict[str, str]],
@@ -94,31 +219,64 @@ class FixedOllamaLLM(LLMBase):
         Returns:
             str: The generated response.
         """
-        # Build parameters for Ollama
-        params = {
-            "model": self.config.model,
-            "messages": messages,
-        }
+        response = self.client.chat(**self._build_params(messages, response_format))
+        return self._parse_response(response, tools)
 
-        # Handle JSON response format
-        # NOTE: We DON'T use Ollama's format="json" parameter because it doesn't enforce
-        # the specific schema from our custom prompt. Instead, we rely on the prompt
-        # examples to guide the model to the correct format.
-        # The custom prompt has detailed examples showing {"facts": [...]} format.
-        if response_format and response_format.get("type") == "json_object":
-            # Don't set format="json" - let the prompt examples guide the structure
-            pass
-
-        # Add options for Ollama (temperature, num_predict, top_p)
-        options = {
-            "temperature": self.config.temperature,
-            "num_predict": self.config.max_tokens,
-            "top_p": self.config.top_p,
-        }
-        params["options"] = options
+    async def agenerate_response(
+        self,
+        messages: List[Dict[str, str]],
+        response_format=None,
+        tools: Optional[List[Dict]] = None,
+        tool_choice: str = "auto",
+        **kwargs,
+    ):
+        """
+        Async version of generate_response() that doesn't block the event loop.
 
-        # Remove OpenAI-specific parameters that Ollama doesn't support
-        params.pop("max_tokens", None)  # Ollama uses different parameter names
+        Concurrent calls with identical messages and response_format share a single
+        Ollama request.
 
-        response = self.client.chat(**params)
+        Args:
+            messages (list): List of message dicts containing 'role' and 'content'.
+            response_format (str or object, optional): Format of the response. Defaults to "text".
+            tools (list, optional): List of tools that the model can call. Defaults to None.
+            tool_choice (str, optional): Tool choice method. Defaults to "auto".
+            **kwargs: Additional Ollama-specific parameters.
+
+        Returns:
+            str: The generated response.
+        """
+        aclient = self._get_aclient()
+        key = json.dumps([messages, response_format], sort_keys=True)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(aclient.chat(**self._build_params(messages, response_format)))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: one caller being cancelled must not cancel the request for the others
+        response = await asyncio.shield(task)
         return self._parse_response(response, tools)
+
+    async def astream_response(
+        self,
+        messages: List[Dict[str, str]],
+        response_format=None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response from Ollama, yielding content as it is generated.
+
+        For interactive use, where output can be shown before generation finishes.
+        mem0 still uses generate_response(), which needs the complete JSON answer.
+
+        Args:
+            messages (list): List of message dicts containing 'role' and 'content'.
+            response_format (str or object, optional): Format of the response. Defaults to "text".
+
+        Yields:
+            str: Response content chunks.
+        """
+        params = self._build_params(messages, response_format)
+        async for chunk in await self._get_aclient().chat(**params, stream=True):
+            content = self._get_content(chunk)
+            if content:
+                yield content
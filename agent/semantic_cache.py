@@ -0,0 +1,168 @@
+"""
+Semantic Response Cache (Redis)
+
+Caches agent responses keyed by the embedding of the user's message, so a repeated or
+near-identical question (greetings, "what do you remember about X") is answered without
+another LLM call. Uses a RediSearch HNSW vector index (Redis Stack), one cached response
+per (user, message embedding), each expiring after a short TTL.
+
+Entries for a user are dropped whenever new memories are stored for them, since a cached
+answer may no longer reflect what the agent knows.
+"""
+import asyncio
+import hashlib
+import logging
+from typing import Callable, List, Optional
+
+try:
+    import numpy as np
+    import redis.asyncio as redis_asyncio
+    from redis.commands.search.field import TagField, VectorField
+    from redis.commands.search.query import Query
+    try:
+        from redis.commands.search.index_definition import IndexDefinition, IndexType
+    except ImportError:
+        from redis.commands.search.indexDefinition import IndexDefinition, IndexType
+except ImportError:
+    redis_asyncio = None  # Semantic cache will be disabled if redis/numpy not available
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """Embedding-keyed response cache backed by a Redis vector index."""
+
+    INDEX_NAME = "qcache"
+    KEY_PREFIX = "qcache:"
+
+    def __init__(
+        self,
+        redis_url: str,
+        embed: Callable[[str], List[float]],
+        threshold: float = 0.95,
+        ttl: int = 600
+    ):
+        """
+        Args:
+            redis_url: Redis Stack connection URL
+            embed: Blocking function returning the embedding of a text (run in a worker thread)
+            threshold: Minimum cosine similarity for a cache hit
+            ttl: Seconds before a cached response expires
+        """
+        if redis_asyncio is None:
+            raise RuntimeError("redis and numpy are required for the semantic cache")
+
+        self.redis = redis_asyncio.from_url(redis_url)
+        self.embed_fn = embed
+        self.max_distance = 1.0 - threshold  # RediSearch COSINE returns 1 - similarity
+        self.ttl = ttl
+        self._index_ready = False
+
+    async def embed(self, text: str) -> Optional[bytes]:
+        """
+        Embed a message for lookup/store.
+
+        Args:
+            text: User message
+
+        Returns:
+            Float32 vector bytes, or None if embedding failed
+        """
+        try:
+            vector = await asyncio.to_thread(self.embed_fn, text)
+            return np.asarray(vector, dtype=np.float32).tobytes()
+        except Exception as e:
+            logger.warning(f"Semantic cache embedding failed: {e}")
+            return None
+
+    async def _ensure_index(self, dim: int) -> None:
+        """Create the vector index on first use (no-op if it already exists)."""
+        if self._index_ready:
+            return
+
+        try:
+            await self.redis.ft(self.INDEX_NAME).info()
+        except Exception:
+            await self.redis.ft(self.INDEX_NAME).create_index(
+                fields=[
+                    TagField("user_id"),
+                    VectorField(
+                        "embedding",
+                        "HNSW",
+                        {"TYPE": "FLOAT32", "DIM": dim, "DISTANCE_METRIC": "COSINE"},
+                    ),
+                ],
+                definition=IndexDefinition(prefix=[self.KEY_PREFIX], index_type=IndexType.HASH),
+            )
+            logger.info(f"Created semantic cache index '{self.INDEX_NAME}' (dim={dim})")
+        self._index_ready = True
+
+    @staticmethod
+    def _escape_tag(value: str) -> str:
+        """Escape a value for use inside a RediSearch TAG query."""
+        return "".join(c if c.isalnum() else f"\\{c}" for c in value)
+
+    async def lookup(self, user_id: str, embedding: bytes) -> Optional[str]:
+        """
+        Find a cached response for a similar message from the same user.
+
+        Args:
+            user_id: User identifier
+            embedding: Message embedding from embed()
+
+        Returns:
+            Cached response, or None on a miss
+        """
+        try:
+            await self._ensure_index(len(embedding) // 4)
+            query = (
+                Query(f"(@user_id:{{{self._escape_tag(user_id)}}})=>[KNN 1 @embedding $vec AS dist]")
+                .return_fields("response", "dist")
+                .dialect(2)
+            )
+            result = await self.redis.ft(self.INDEX_NAME).search(query, query_params={"vec": embedding})
+            if result.docs and float(result.docs[0].dist) <= self.max_distance:
+                logger.info(f"Semantic cache hit (distance={float(result.docs[0].dist):.4f})")
+                response = result.docs[0].response
+                return response.decode("utf-8") if isinstance(response, bytes) else response
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup failed: {e}")
+        return None
+
+    async def store(self, user_id: str, embedding: bytes, response: str) -> None:
+        """
+        Cache a response for a message.
+
+        Args:
+            user_id: User identifier
+            embedding: Message embedding from embed()
+            response: Agent response
+        """
+        key = f"{self.KEY_PREFIX}{user_id}:{hashlib.md5(embedding).hexdigest()}"
+        try:
+            await self._ensure_index(len(embedding) // 4)
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.hset(key, mapping={"user_id": user_id, "embedding": embedding, "response": response})
+                pipe.expire(key, self.ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Semantic cache store failed: {e}")
+
+    async def invalidate(self, user_id: str) -> None:
+        """
+        Drop every cached response for a user.
+
+        Args:
+            user_id: User identifier
+        """
+        try:
+            keys = [key async for key in self.redis.scan_iter(match=f"{self.KEY_PREFIX}{user_id}:*")]
+            if keys:
+                await self.redis.delete(*keys)
+                logger.info(f"Invalidated {len(keys)} semantic cache entries for {user_id}")
+        except Exception as e:
+            logger.warning(f"Semantic cache invalidation failed: {e}")
+
+    async def close(self) -> None:
+        """Close the Redis connection."""
+        await self.redis.aclose()
@@ -8,10 +8,11 @@ Tests the hybrid memory system's graph capabilities with proper custom prompts.
 import asyncio
 import json
 import logging
-import os
+import time
 from datetime import datetime
 from hybrid_memory import HybridMemoryManager
 from main import CUSTOM_FACT_EXTRACTION_PROMPT, CUSTOM_UPDATE_MEMORY_PROMPT
+from mem0_configs import OPENAI_API_KEY, OPENAI_MEM0_CONFIG
 
 # Setup logging
 logging.basicConfig(
@@ -20,40 +21,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Configuration
-OPENAI_API_KEY = os.environ.get("OPENAI_GRAPH_API_KEY", "")
-
 # mem0 config with OpenAI and CUSTOM PROMPTS
 mem0_config = {
-    "llm": {
-        "provider": "openai",
-        "config": {
-            "model": "gpt-4o-mini",
-            "temperature": 0.1,
-            "max_tokens": 4000,
-            "api_key": OPENAI_API_KEY,
-            "openai_base_url": "https://api.openai.com/v1",
-        }
-    },
-    "vector_store": {
-        "provider": "pgvector",
-        "config": {
-            "dbname": "agent_memory",
-            "user": "postgres",
-            "password": "postgres",
-            "host": "postgres-memory",
-            "port": 5432,
-            "embedding_model_dims": 768,
-        }
-    },
-    "embedder": {
-        "provider": "ollama",
-        "config": {
-            "model": "nomic-embed-text:latest",
-            "ollama_base_url": "http://192.168.1.97:11434",
-            "embedding_dims": 768,
-        }
-    },
+    **OPENAI_MEM0_CONFIG,
     "custom_fact_extraction_prompt": CUSTOM_FACT_EXTRACTION_PROMPT,
     "custom_update_memory_prompt": CUSTOM_UPDATE_MEMORY_PROMPT,
 }
@@ -75,6 +45,11 @@ async def test_single_fact_extraction():
 
     await manager.initialize()
 
+    # Warm up connections and the embedding model so cold starts don't land in the timings
+    warmup_start = time.perf_counter()
+    await manager.warmup()
+    print(f"Warmup took {time.perf_counter() - warmup_start:.2f}s")
+
     try:
         user_id = "quick_test_user"
 
@@ -3,6 +3,7 @@
 
 from mem0 import Memory
 import json
+from mem0_configs import OLLAMA_MEM0_CONFIG
 
 CUSTOM_FACT_EXTRACTION_PROMPT = """You extract facts from the user line only. Extract ALL specific details separately.
 
@@ -22,32 +23,7 @@ Extract facts from the user line only. Output must be valid JSON.
 """
 
 mem0_config = {
-    "llm": {
-        "provider": "ollama",
-        "config": {
-            "model": "llama3.1:8b",
-            "ollama_base_url": "http://192.168.1.97:11434",
-        }
-    },
-    "vector_store": {
-        "provider": "pgvector",
-        "config": {
-            "dbname": "agent_memory",
-            "user": "postgres",
-            "password": "postgres",
-            "host": "postgres-memory",
-            "port": 5432,
-            "embedding_model_dims": 768,
-        }
-    },
-    "embedder": {
-        "provider": "ollama",
-        "config": {
-            "model": "nomic-embed-text:latest",
-            "ollama_base_url": "http://192.168.1.97:11434",
-            "embedding_dims": 768,
-        }
-    },
+    **OLLAMA_MEM0_CONFIG,
     "custom_fact_extraction_prompt": CUSTOM_FACT_EXTRACTION_PROMPT,
 }
 
@@ -3,36 +3,10 @@
 
 from mem0 import Memory
 import json
+from mem0_configs import OLLAMA_MEM0_CONFIG
 
 # Simple test config
-mem0_config = {
-    "llm": {
-        "provider": "ollama",
-        "config": {
-            "model": "llama3.1:8b",
-            "ollama_base_url": "http://192.168.1.97:11434",
-        }
-    },
-    "vector_store": {
-        "provider": "pgvector",
-        "config": {
-            "dbname": "agent_memory",
-            "user": "postgres",
-            "password": "postgres",
-            "host": "postgres-memory",
-            "port": 5432,
-            "embedding_model_dims": 768,
-        }
-    },
-    "embedder": {
-        "provider": "ollama",
-        "config": {
-            "model": "nomic-embed-text:latest",
-            "ollama_base_url": "http://192.168.1.97:11434",
-            "embedding_dims": 768,
-        }
-    },
-}
+mem0_config = OLLAMA_MEM0_CONFIG
 
 print("=" * 80)
 print("Testing mem0 with DEFAULT prompts...")
@@ -3,9 +3,11 @@
 Test optimized fact extraction prompt quality
 """
 import asyncio
+import hashlib
 import os
 import json
 from mem0 import Memory
+from mem0_configs import OLLAMA_EMBEDDER, PGVECTOR_STORE
 
 # Import optimized prompt
 import sys
@@ -51,38 +53,114 @@ TEST_CASES = [
     },
 ]
 
+# Concurrent cases in flight (keeps gpt-4o-mini under the rate limit)
+MAX_CONCURRENT_CASES = 3
+
+# Opt-in cache of extracted facts from earlier runs (e.g. FACT_CACHE_PATH=/tmp/fact_cache.json),
+# keyed by hash of LLM config + prompt + input. Unset by default so quality runs always re-extract.
+FACT_CACHE_PATH = os.environ.get("FACT_CACHE_PATH", "")
+
+# Extraction LLM (part of the fact cache key, so a model/config change re-extracts)
+LLM_CONFIG = {
+    "provider": "openai",
+    "config": {
+        "model": "gpt-4o-mini",
+        "temperature": 0,
+        "api_key": os.environ.get("OPENAI_GRAPH_API_KEY"),
+    }
+}
+
+
+def _load_fact_cache() -> dict:
+    """Load cached extractions (empty if disabled, missing or unreadable)"""
+    if not FACT_CACHE_PATH:
+        return {}
+    try:
+        with open(FACT_CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _save_fact_cache(cache: dict) -> None:
+    """Persist cached extractions"""
+    if FACT_CACHE_PATH:
+        with open(FACT_CACHE_PATH, "w") as f:
+            json.dump(cache, f, indent=2)
+
+
+def _fact_cache_key(text: str) -> str:
+    """Cache key for an input (changing the LLM config or the prompt invalidates every entry)"""
+    llm = {**LLM_CONFIG, "config": {k: v for k, v in LLM_CONFIG["config"].items() if k != "api_key"}}
+    payload = json.dumps([llm, OPTIMIZED_CUSTOM_FACT_EXTRACTION_PROMPT, text], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+async def _run_case(i, test_case, memory, sem, cache):
+    """
+    Run one test case
+
+    Args:
+        i: 1-based case number (also picks the isolated test user)
+        test_case: Entry from TEST_CASES
+        memory: Shared mem0 Memory
+        sem: Semaphore bounding concurrent cases
+        cache: Fact cache from _load_fact_cache(), updated on a miss
+
+    Returns:
+        (passed, report lines)
+    """
+    lines = [
+        f"Test {i}/{len(TEST_CASES)}: {test_case['description']}",
+        f"Input: \"{test_case['input']}\"",
+        f"Expected: {len(test_case['expected_facts'])} facts",
+    ]
+
+    key = _fact_cache_key(test_case['input'])
+    facts = cache.get(key)
+    cached = facts is not None
+
+    if not cached:
+        async with sem:
+            # Add message and extract facts
+            result = await asyncio.to_thread(
+                memory.add,
+                messages=[
+                    {"role": "user", "content": test_case['input']},
+                    {"role": "assistant", "content": "Understood!"}
+                ],
+                user_id=f"test_user_{i}",
+                infer=True
+            )
+        facts = cache[key] = [fact['memory'] for fact in result.get('results', [])]
+
+        # Cleanup (the test user only holds this case's facts)
+        await asyncio.to_thread(memory.delete_all, user_id=f"test_user_{i}")
+
+    extracted_count = len(facts)
+    expected_count = len(test_case['expected_facts'])
+
+    lines.append(f"Extracted: {extracted_count} facts{' (cached)' if cached else ''}")
+
+    if extracted_count > 0:
+        lines.append("Facts extracted:")
+        lines.extend(f"  - {fact}" for fact in facts)
+
+    # Basic quality check: did we extract roughly the right number of facts?
+    passed = extracted_count >= expected_count * 0.7  # Allow 30% variance
+    lines.append("✓ PASS" if passed else f"✗ FAIL - Expected ~{expected_count}, got {extracted_count}")
+
+    return passed, lines
+
+
 async def test_extraction_quality():
     """Test optimized prompt against diverse inputs"""
 
     # Configure mem0 with optimized prompt
     config = {
-        "llm": {
-            "provider": "openai",
-            "config": {
-                "model": "gpt-4o-mini",
-                "temperature": 0,
-                "api_key": os.environ.get("OPENAI_GRAPH_API_KEY"),
-            }
-        },
-        "vector_store": {
-            "provider": "pgvector",
-            "config": {
-                "dbname": "agent_memory",
-                "user": "postgres",
-                "password": "postgres",
-                "host": "postgres-memory",
-                "port": 5432,
-                "embedding_model_dims": 768,
-            }
-        },
-        "embedder": {
-            "provider": "ollama",
-            "config": {
-                "model": "nomic-embed-text:latest",
-                "ollama_base_url": "http://192.168.1.97:11434",
-                "embedding_dims": 768,
-            }
-        },
+        "llm": LLM_CONFIG,
+        "vector_store": PGVECTOR_STORE,
+        "embedder": OLLAMA_EMBEDDER,
         "custom_fact_extraction_prompt": OPTIMIZED_CUSTOM_FACT_EXTRACTION_PROMPT,
     }
 
@@ -94,47 +172,21 @@ async def test_extraction_quality():
     print()
 
     total_tests = len(TEST_CASES)
-    passed = 0
-    failed = 0
-
-    for i, test_case in enumerate(TEST_CASES, 1):
-        print(f"Test {i}/{total_tests}: {test_case['description']}")
-        print(f"Input: \"{test_case['input']}\"")
-        print(f"Expected: {len(test_case['expected_facts'])} facts")
-
-        # Add message and extract facts
-        result = memory.add(
-            messages=[
-                {"role": "user", "content": test_case['input']},
-                {"role": "assistant", "content": "Understood!"}
-            ],
-            user_id=f"test_user_{i}",
-            infer=True
-        )
-
-        extracted_count = len(result.get('results', []))
-        expected_count = len(test_case['expected_facts'])
-
-        print(f"Extracted: {extracted_count} facts")
-
-        if extracted_count > 0:
-            print("Facts extracted:")
-            for fact in result.get('results', []):
-                print(f"  - {fact['memory']}")
-
-        # Basic quality check: did we extract roughly the right number of facts?
-        if extracted_count >= expected_count * 0.7:  # Allow 30% variance
-            print("✓ PASS")
-            passed += 1
-        else:
-            print(f"✗ FAIL - Expected ~{expected_count}, got {extracted_count}")
-            failed += 1
 
+    # Each case writes to its own test user, so they can run side by side
+    sem = asyncio.Semaphore(MAX_CONCURRENT_CASES)
+    cache = _load_fact_cache()
+    results = await asyncio.gather(*(
+        _run_case(i, test_case, memory, sem, cache) for i, test_case in enumerate(TEST_CASES, 1)
+    ))
+    _save_fact_cache(cache)
+
+    for _, lines in results:
+        print("\n".join(lines))
         print()
 
-        # Cleanup
-        for fact in result.get('results', []):
-            memory.delete(memory_id=fact['id'])
+    passed = sum(case_passed for case_passed, _ in results)
+    failed = total_tests - passed
 
     print("="*80)
     print(f"RESULTS: {passed}/{total_tests} passed, {failed}/{total_tests} failed")
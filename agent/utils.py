@@ -2,15 +2,37 @@
 Utility functions for Pydantic AI Agent
 """
 import logging
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Optional, TypedDict
 from datetime import datetime
 from rich.console import Console
 from rich.panel import Panel
 from rich.markdown import Markdown
+from rich.text import Text
 
 # Initialize rich console for beautiful output
 console = Console()
 
+# Control characters removed by sanitize_input (tab, newline and carriage return are kept)
+_SANITIZE_TABLE = dict.fromkeys(
+    [c for c in range(0x20) if c not in (0x09, 0x0A, 0x0D)] + [0x7F]
+)
+
+# Commands that end the conversation loop
+EXIT_COMMANDS = frozenset({'quit', 'exit', 'bye', 'goodbye'})
+
+# Styled speaker labels, built once instead of re-parsing markup on every message
+_USER_PREFIX = Text("\nYou: ", style="bold cyan")
+_AGENT_PREFIX = Text("\nAgent: ", style="bold green")
+_ERROR_PREFIX = Text("\nError: ", style="bold red")
+
+
+class ConversationMetadata(TypedDict):
+    """Session metadata attached to every memory write (plain dict, no validation)"""
+    user_id: str
+    session_id: str
+    timestamp: str
+
 
 def setup_logging(level: str = "INFO") -> logging.Logger:
     """
@@ -30,14 +52,9 @@ def setup_logging(level: str = "INFO") -> logging.Logger:
     return logging.getLogger(__name__)
 
 
-def print_welcome_message(agent_name: str, prompt_template: str) -> None:
-    """
-    Print welcome message with agent information
-
-    Args:
-        agent_name: Name of the agent
-        prompt_template: Template being used
-    """
+@lru_cache(maxsize=8)
+def _welcome_panel(agent_name: str, prompt_template: str) -> Panel:
+    """Build (and keep) the welcome panel, so its Markdown is parsed only once."""
     welcome_text = f"""
 # Welcome to {agent_name}!
 
@@ -51,7 +68,18 @@ def print_welcome_message(agent_name: str, prompt_template: str) -> None:
 
 Type your message and press Enter to chat. Type 'quit' or 'exit' to end the session.
     """
-    console.print(Panel(Markdown(welcome_text), title="Pydantic AI Agent", border_style="blue"))
+    return Panel(Markdown(welcome_text), title="Pydantic AI Agent", border_style="blue")
+
+
+def print_welcome_message(agent_name: str, prompt_template: str) -> None:
+    """
+    Print welcome message with agent information
+
+    Args:
+        agent_name: Name of the agent
+        prompt_template: Template being used
+    """
+    console.print(_welcome_panel(agent_name, prompt_template))
 
 
 def print_user_message(message: str) -> None:
@@ -61,7 +89,7 @@ def print_user_message(message: str) -> None:
     Args:
         message: User message to display
     """
-    console.print(f"\n[bold cyan]You:[/bold cyan] {message}")
+    console.print(Text.assemble(_USER_PREFIX, message))
 
 
 def print_agent_message(message: str) -> None:
@@ -71,7 +99,7 @@ def print_agent_message(message: str) -> None:
     Args:
         message: Agent response to display
     """
-    console.print(f"\n[bold green]Agent:[/bold green] {message}\n")
+    console.print(Text.assemble(_AGENT_PREFIX, message, "\n"))
 
 
 def print_system_message(message: str, style: str = "yellow") -> None:
@@ -82,7 +110,7 @@ def print_system_message(message: str, style: str = "yellow") -> None:
         message: System message to display
         style: Rich style to apply
     """
-    console.print(f"\n[{style}]System: {message}[/{style}]\n")
+    console.print(Text(f"\nSystem: {message}\n", style=style))
 
 
 def print_error(error: str) -> None:
@@ -92,7 +120,7 @@ def print_error(error: str) -> None:
     Args:
         error: Error message to display
     """
-    console.print(f"\n[bold red]Error:[/bold red] {error}\n")
+    console.print(Text.assemble(_ERROR_PREFIX, error, "\n"))
 
 
 def format_memory_context(memories: list) -> str:
@@ -108,14 +136,12 @@ def format_memory_context(memories: list) -> str:
     if not memories:
         return "No previous context found."
 
-    context = "Relevant context from previous conversations:\n"
-    for i, memory in enumerate(memories, 1):
-        context += f"{i}. {memory}\n"
-
-    return context
+    return "Relevant context from previous conversations:\n" + "".join(
+        f"{i}. {memory}\n" for i, memory in enumerate(memories, 1)
+    )
 
 
-def create_conversation_metadata(user_id: str, session_id: Optional[str] = None) -> Dict[str, Any]:
+def create_conversation_metadata(user_id: str, session_id: Optional[str] = None) -> ConversationMetadata:
     """
     Create metadata for conversation tracking
 
@@ -126,10 +152,11 @@ def create_conversation_metadata(user_id: str, session_id: Optional[str] = None)
     Returns:
         Metadata dictionary
     """
+    now = datetime.now()
     return {
         "user_id": user_id,
-        "session_id": session_id or f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-        "timestamp": datetime.now().isoformat(),
+        "session_id": session_id or f"session_{now:%Y%m%d_%H%M%S}",
+        "timestamp": now.isoformat(),
     }
 
 
@@ -143,14 +170,9 @@ def sanitize_input(user_input: str) -> str:
     Returns:
         Sanitized input string
     """
-    # Strip whitespace
-    sanitized = user_input.strip()
-
-    # Basic sanitization - can be extended
-    # For now, just remove any null bytes
-    sanitized = sanitized.replace('\x00', '')
-
-    return sanitized
+    # Remove null bytes and other control characters in a single translate pass,
+    # then strip whitespace (removed characters may have been hiding some)
+    return user_input.translate(_SANITIZE_TABLE).strip()
 
 
 def is_exit_command(user_input: str) -> bool:
@@ -163,5 +185,4 @@ def is_exit_command(user_input: str) -> bool:
     Returns:
         True if exit command, False otherwise
     """
-    exit_commands = ['quit', 'exit', 'bye', 'goodbye']
-    return user_input.lower().strip() in exit_commands
+    return user_input.strip().casefold() in EXIT_COMMANDS
@@ -14,61 +14,71 @@ NEO4J_USERNAME = os.getenv('NEO4J_USERNAME', 'neo4j')
 NEO4J_PASSWORD = os.getenv('NEO4J_PASSWORD', 'password123')
 NEO4J_DATABASE = os.getenv('NEO4J_DATABASE', 'neo4j')
 
+# Fulltext index on entity names (mem0 graph and Graphiti labels). The 'simple' analyzer
+# splits on non-letters, so 'captiva' matches 'captiva_island' like the old CONTAINS did.
+NAME_INDEX = "name_fts"
+
 print(f"Connecting to Neo4j at {NEO4J_URI}...")
 
 try:
     driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USERNAME, NEO4J_PASSWORD))
 
-    with driver.session(database=NEO4J_DATABASE) as session:
-        # Count all nodes
-        result = session.run("MATCH (n) RETURN count(n) as node_count")
-        node_count = result.single()['node_count']
-        print(f"\n=== Total Nodes: {node_count} ===\n")
-
-        # Get all nodes with their labels
-        result = session.run("MATCH (n) RETURN labels(n) as labels, n LIMIT 20")
-        print("=== All Nodes ===")
-        for record in result:
-            print(f"Labels: {record['labels']}, Node: {dict(record['n'])}")
-
-        # Count all relationships
-        result = session.run("MATCH ()-[r]->() RETURN count(r) as rel_count")
-        rel_count = result.single()['rel_count']
-        print(f"\n=== Total Relationships: {rel_count} ===\n")
-
-        # Get all relationships with details
-        result = session.run("""
+    def collect(tx):
+        """Run every verification query in one read transaction."""
+        counts = tx.run("""
+            CALL { MATCH (n) RETURN count(n) as node_count }
+            CALL { MATCH ()-[r]->() RETURN count(r) as rel_count }
+            RETURN node_count, rel_count
+        """).single()
+        nodes = list(tx.run("MATCH (n) RETURN labels(n) as labels, n LIMIT 20"))
+        relationships = list(tx.run("""
             MATCH (a)-[r]->(b)
             RETURN labels(a) as from_labels, a.name as from_name,
                    type(r) as rel_type,
                    labels(b) as to_labels, b.name as to_name
             LIMIT 50
-        """)
-        print("=== All Relationships ===")
-        for record in result:
-            print(f"{record['from_labels']} '{record['from_name']}' --[{record['rel_type']}]--> {record['to_labels']} '{record['to_name']}'")
+        """))
+        kayaking_nodes = list(tx.run("""
+            CALL db.index.fulltext.queryNodes($index, $q) YIELD node
+            RETURN labels(node) as labels, node as n
+        """, index=NAME_INDEX, q="kayaking OR florida OR captiva OR sanibel"))
+        kayaking_rels = list(tx.run("""
+            CALL db.index.fulltext.queryNodes($index, $q) YIELD node
+            MATCH (node)-[r]-()
+            RETURN DISTINCT startNode(r).name as from, type(r) as rel, endNode(r).name as to
+        """, index=NAME_INDEX, q="kayaking OR florida OR captiva"))
+        return counts, nodes, relationships, kayaking_nodes, kayaking_rels
+
+    with driver.session(database=NEO4J_DATABASE) as session:
+        # Schema writes can't share the read transaction; both are no-ops once the index exists
+        session.run(f"""
+            CREATE FULLTEXT INDEX {NAME_INDEX} IF NOT EXISTS
+            FOR (n:__Entity__|Entity) ON EACH [n.name]
+            OPTIONS {{indexConfig: {{`fulltext.analyzer`: 'simple'}}}}
+        """).consume()
+        session.run("CALL db.awaitIndex($index)", index=NAME_INDEX).consume()
+        counts, nodes, relationships, kayaking_nodes, kayaking_rels = session.execute_read(collect)
 
-        # Check for recent kayaking-related relationships
-        print("\n=== Kayaking-Related Entities ===")
-        result = session.run("""
-            MATCH (n)
-            WHERE n.name CONTAINS 'kayaking' OR n.name CONTAINS 'florida'
-               OR n.name CONTAINS 'captiva' OR n.name CONTAINS 'sanibel'
-            RETURN labels(n) as labels, n
-        """)
-        for record in result:
-            print(f"Labels: {record['labels']}, Node: {dict(record['n'])}")
+    print(f"\n=== Total Nodes: {counts['node_count']} ===\n")
 
-        print("\n=== Kayaking Relationships ===")
-        result = session.run("""
-            MATCH (a)-[r]->(b)
-            WHERE a.name CONTAINS 'kayaking' OR b.name CONTAINS 'kayaking'
-               OR a.name CONTAINS 'florida' OR b.name CONTAINS 'florida'
-               OR a.name CONTAINS 'captiva' OR b.name CONTAINS 'captiva'
-            RETURN a.name as from, type(r) as rel, b.name as to
-        """)
-        for record in result:
-            print(f"{record['from']} --[{record['rel']}]--> {record['to']}")
+    print("=== All Nodes ===")
+    for record in nodes:
+        print(f"Labels: {record['labels']}, Node: {dict(record['n'])}")
+
+    print(f"\n=== Total Relationships: {counts['rel_count']} ===\n")
+
+    print("=== All Relationships ===")
+    for record in relationships:
+        print(f"{record['from_labels']} '{record['from_name']}' --[{record['rel_type']}]--> {record['to_labels']} '{record['to_name']}'")
+
+    # Check for recent kayaking-related relationships
+    print("\n=== Kayaking-Related Entities ===")
+    for record in kayaking_nodes:
+        print(f"Labels: {record['labels']}, Node: {dict(record['n'])}")
+
+    print("\n=== Kayaking Relationships ===")
+    for record in kayaking_rels:
+        print(f"{record['from']} --[{record['rel']}]--> {record['to']}")
 
     driver.close()
     print("\n✅ GraphRAG verification complete!")